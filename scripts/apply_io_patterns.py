@@ -8,16 +8,27 @@ entries based on explicit feeder_type field.
 Usage:
     python apply_io_patterns.py --database database.yaml --equipment equipment-list.qmd
     python apply_io_patterns.py -d database.yaml -e equipment-list.qmd --output updated.yaml
+    python apply_io_patterns.py -d database.yaml -e equipment-list.qmd --cache
 """
 
 import argparse
+import functools
+import os
 import re
 import sys
-import uuid
 from pathlib import Path
+from typing import NamedTuple
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper
+
+# Shared with the other scripts in this directory (--cache JSON sidecar)
+from database_io import load_database, save_database_cache
+
 
 # =============================================================================
 # FEEDER TYPE TO PATTERN MAPPING
@@ -116,39 +127,117 @@ FEEDER_DISPLAY = {
     "DEFAULT": "Direct",
 }
 
+# Flattened EQUIPMENT_PATTERN_MAP: (eq_type, feeder_type) -> (pattern_name, feeder_display)
+_RESOLVED_PATTERNS = {
+    (eq_type, feeder): (pattern_name, FEEDER_DISPLAY.get(feeder, feeder))
+    for eq_type, table in EQUIPMENT_PATTERN_MAP.items()
+    for feeder, pattern_name in table.items()
+    if feeder != "DEFAULT"
+}
+# eq_type -> pattern used when the feeder_type has no specific entry
+_DEFAULT_PATTERNS = {
+    eq_type: table["DEFAULT"]
+    for eq_type, table in EQUIPMENT_PATTERN_MAP.items()
+    if "DEFAULT" in table
+}
+_PATTERN_EQUIPMENT_TYPES = frozenset(EQUIPMENT_PATTERN_MAP)
+
+# Known feeder spellings (canonical and lowercase) -> canonical key, so the
+# common case skips per-call .upper().strip()
+_FEEDER_NORMALIZE = {k.lower(): k for k in FEEDER_DISPLAY}
+_FEEDER_NORMALIZE.update({k: k for k in FEEDER_DISPLAY})
+
+
+def normalize_feeder_type(raw: str | None) -> str:
+    """Return the canonical uppercase feeder_type key ('' if unset)."""
+    if not raw:
+        return ""
+    return _FEEDER_NORMALIZE.get(raw) or raw.upper().strip()
+
+
+class _NoAliasDumper(_SafeDumper):
+    """Dumper that writes shared sub-dicts (e.g. electrical blocks) inline instead of as &id aliases."""
+
+    def ignore_aliases(self, data):
+        return True
+
 
 def load_yaml(path: Path) -> dict:
     """Load YAML file."""
-    with open(path) as f:
-        return yaml.safe_load(f)
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=_SafeLoader)
 
 
-def load_qmd_frontmatter(path: Path) -> dict:
-    """Load QMD frontmatter directly as YAML."""
-    with open(path) as f:
-        content = f.read()
+def save_yaml(database: dict, path: Path) -> None:
+    """Write database YAML, emitting the instruments list one entry at a time.
 
-    parts = content.split("---")
-    if len(parts) < 3:
-        raise ValueError(f"Invalid QMD format in {path}: no YAML frontmatter found")
+    Output is identical to a single yaml.dump of the whole database, but the
+    emitter only ever holds one instrument's event stream in memory. Long
+    scalars are written on one line rather than folded at 80 columns.
+    """
+    # width must be an int for the libyaml emitter (float("inf") is rejected)
+    dump_opts = {"Dumper": _NoAliasDumper, "default_flow_style": False,
+                 "sort_keys": False, "allow_unicode": True, "width": 1 << 30}
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        for key, value in database.items():
+            if key == "instruments" and isinstance(value, list) and value:
+                f.write("instruments:\n")
+                for inst in value:
+                    yaml.dump([inst], f, **dump_opts)
+            else:
+                yaml.dump({key: value}, f, **dump_opts)
 
-    return yaml.safe_load(parts[1])
 
+def load_qmd_frontmatter(path: Path) -> dict:
+    """Load QMD frontmatter directly as YAML.
 
-def load_io_patterns(patterns_path: Path) -> dict:
-    """Load IO patterns from templates/io-patterns.yaml."""
-    with open(patterns_path) as f:
-        return yaml.safe_load(f)
+    Reads line by line up to the closing '---' marker; the QMD body is never read.
+    """
+    with open(path, "rb") as f:
+        # Opening marker: first non-blank line (ignoring a UTF-8 BOM)
+        opening = b""
+        for line in f:
+            opening = line.strip().lstrip(b"\xef\xbb\xbf")
+            if opening:
+                break
+        if opening != b"---":
+            raise ValueError(f"Invalid QMD format in {path}: no YAML frontmatter found")
+
+        frontmatter = []
+        for line in f:
+            if line.strip() == b"---":
+                break
+            frontmatter.append(line)
+        else:
+            raise ValueError(f"Invalid QMD format in {path}: unterminated YAML frontmatter")
+
+    return yaml.load(b"".join(frontmatter), Loader=_SafeLoader)
 
 
+def load_io_patterns(patterns_path: Path) -> dict:
+    """Load IO patterns from templates/io-patterns.yaml and compile their signals."""
+    with open(patterns_path, "rb") as f:
+        patterns = yaml.load(f, Loader=_SafeLoader)
+    _compile_patterns(patterns)
+    return patterns
+
+
+# Standard: NNN-XXX-NN or XNNN-XXX-NN (W-prefix)
+_EQUIPMENT_TAG_RE = re.compile(r"[A-Z]?\d{3,4}-([A-Z]+)-\d+")
+# Short form: XXX-NN (e.g., SM-02)
+_SHORT_EQUIPMENT_TAG_RE = re.compile(r"([A-Z]{1,5})-\d+")
+# Trailing paired suffixes: NNN-XX-NN/NN/NN -> /NN/NN
+_PAIRED_SUFFIX_RE = re.compile(r"(/\d+)+$")
+# Paired/multi tag split into (prefix, first sequence, /NN... group)
+_PAIRED_TAG_RE = re.compile(r"^([A-Z]?\d{3,4}-[A-Z]{1,5}-)(\d+)((?:/\d+)+)$")
+# Single ISA equipment tag split into (prefix, sequence)
+_SEQUENCED_TAG_RE = re.compile(r"^([A-Z]?\d{3,4}-[A-Z]{1,5}-)(\d+)$")
+
+
+@functools.lru_cache(maxsize=4096)
 def extract_equipment_type(tag: str) -> str:
     """Extract equipment type code from tag (e.g., '200-P-01' -> 'P', 'W501-P-01' -> 'P')."""
-    # Standard: NNN-XXX-NN or XNNN-XXX-NN (W-prefix)
-    match = re.match(r"[A-Z]?\d{3,4}-([A-Z]+)-\d+", tag)
-    if match:
-        return match.group(1)
-    # Short form: XXX-NN (e.g., SM-02)
-    match = re.match(r"([A-Z]{1,5})-\d+", tag)
+    match = _EQUIPMENT_TAG_RE.match(tag) or _SHORT_EQUIPMENT_TAG_RE.match(tag)
     return match.group(1) if match else ""
 
 
@@ -161,15 +250,26 @@ def normalize_equipment_tag(raw_tag: str) -> list[str]:
       - 'SM-02, 401-F-01/02' -> ['SM-02', '401-F-01']
       - '101-P-01' -> ['101-P-01']
     """
+    return list(_normalize_equipment_tag_cached(raw_tag))
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_equipment_tag_cached(raw_tag: str) -> tuple[str, ...]:
+    """Memoized normalize_equipment_tag; returns an immutable tuple for internal callers."""
+    # Common case: a single canonical tag, nothing to split or strip
+    if "," not in raw_tag and "/" not in raw_tag:
+        tag = raw_tag.strip()
+        return (tag,) if tag else ()
+
     results = []
     # Split on comma
     parts = [t.strip() for t in raw_tag.split(",")]
     for part in parts:
         # Strip ALL paired suffixes: NNN-XX-NN/NN/NN -> NNN-XX-NN
-        cleaned = re.sub(r"(/\d+)+$", "", part)
+        cleaned = _PAIRED_SUFFIX_RE.sub("", part)
         if cleaned:
             results.append(cleaned)
-    return results
+    return tuple(results)
 
 
 def get_pattern_for_equipment(equipment: dict) -> tuple[str | None, str | None]:
@@ -183,30 +283,109 @@ def get_pattern_for_equipment(equipment: dict) -> tuple[str | None, str | None]:
         Tuple of (pattern_name, feeder_display) or (None, None) if not mappable
     """
     tag = equipment.get("tag", "")
-    feeder_type = (equipment.get("feeder_type") or "").upper().strip()
+    feeder_type = normalize_feeder_type(equipment.get("feeder_type"))
 
     if not feeder_type:
         return (None, None)
 
     eq_type = extract_equipment_type(tag)
-    if not eq_type:
+    if eq_type not in _PATTERN_EQUIPMENT_TYPES:
         return (None, None)
 
-    # Look up pattern table for this equipment type
-    pattern_table = EQUIPMENT_PATTERN_MAP.get(eq_type)
-    if not pattern_table:
-        return (None, None)
+    resolved = _RESOLVED_PATTERNS.get((eq_type, feeder_type))
+    if resolved:
+        return resolved
 
-    # Find pattern for this feeder type
-    pattern_name = pattern_table.get(feeder_type) or pattern_table.get("DEFAULT")
+    # Equipment types with a catch-all pattern (MOV, SOV)
+    pattern_name = _DEFAULT_PATTERNS.get(eq_type)
     if not pattern_name:
         return (None, None)
 
-    feeder_display = FEEDER_DISPLAY.get(feeder_type, feeder_type)
-    return (pattern_name, feeder_display)
+    return (pattern_name, FEEDER_DISPLAY.get(feeder_type, feeder_type))
+
+
+# Random hex digit -> RFC 4122 variant digit (10xx)
+_UUID_VARIANT = {c: "89ab"[int(c, 16) & 3] for c in "0123456789abcdef"}
+
+
+def _uuid4_strings(batch: int = 4096):
+    """Yield random UUID4 strings, drawing entropy from os.urandom in batches.
+
+    The version and variant digits are patched directly into the hex text, so no
+    uuid.UUID object is built per ID.
+    """
+    while True:
+        pool = os.urandom(16 * batch).hex()
+        for i in range(0, len(pool), 32):
+            h = pool[i:i + 32]
+            yield f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{_UUID_VARIANT[h[16]]}{h[17:20]}-{h[20:]}"
+
+
+_next_uuid = _uuid4_strings().__next__
+
+
+# One shared (read-only by convention) electrical block per feeder_type display name
+_electrical_cache: dict[str | None, dict] = {}
+
+
+# Key order of generated io_signal entries (also their order in the dumped YAML).
+# Per-signal fields (io_point_id, tags, pattern_source, electrical) are filled in
+# by generate_io_signals on a copy of the template.
+_SIGNAL_KEYS = (
+    "io_point_id", "signal_function", "io_type", "signal_type", "termination",
+    "component_type", "plc_tag", "field_tag", "suffix", "description", "protocol",
+    "pattern_source", "electrical",
+)
+
+
+def _compile_signals(pattern: dict) -> list[tuple[str, dict]]:
+    """Resolve a pattern's signal defaults into (tag_suffix, template) pairs.
+
+    tag_suffix is the text appended to the base tag: "-{suffix}", or "" when the
+    signal has no suffix.
+    """
+    templates = []
+    for sig in pattern.get("signals", []):
+        suffix = sig.get("suffix", "")
+        template = dict(zip(_SIGNAL_KEYS, (
+            None,  # io_point_id
+            sig.get("function", "Status"),
+            sig.get("io_type", "DI"),
+            sig.get("signal_type", "24V DC"),
+            "PLC",  # termination
+            sig.get("component", ""),
+            None,  # plc_tag
+            None,  # field_tag
+            suffix,
+            sig.get("description", ""),
+            sig.get("protocol"),
+            None,  # pattern_source
+            None,  # electrical
+        )))
+        # protocol and marshalling are optional in the schema; omit rather than emit nulls
+        if template["protocol"] is None:
+            del template["protocol"]
+        # Intern the small vocabulary ("DI", "24V DC", "Status", ...) so every
+        # pattern's templates share one string object per value
+        for key, value in template.items():
+            if isinstance(value, str):
+                template[key] = sys.intern(value)
+        templates.append((f"-{suffix}" if suffix else "", template))
+    return templates
+
+
+def _compile_patterns(patterns: dict) -> None:
+    """Store each pattern's compiled signals under "_compiled_signals".
+
+    Patterns are applied to many instruments; resolving the signal defaults
+    here means generate_io_signals only copies templates.
+    """
+    for pattern in (patterns or {}).values():
+        if isinstance(pattern, dict):
+            pattern["_compiled_signals"] = _compile_signals(pattern)
 
 
-def generate_io_signals(pattern: dict, base_tag: str, feeder_type: str) -> list:
+def generate_io_signals(pattern: dict, base_tag: str, feeder_type: str | None, pattern_name: str) -> list:
     """
     Generate io_signals list from pattern definition.
 
@@ -214,33 +393,96 @@ def generate_io_signals(pattern: dict, base_tag: str, feeder_type: str) -> list:
         pattern: Pattern definition from io-patterns.yaml
         base_tag: Base instrument tag
         feeder_type: Electrical feeder type display name
+        pattern_name: Pattern key, recorded as each signal's pattern_source
 
     Returns:
         List of io_signal entries
     """
+    electrical = _electrical_cache.get(feeder_type)
+    if electrical is None:
+        electrical = _electrical_cache[feeder_type] = {"feeder_type": feeder_type}
+
+    compiled = pattern.get("_compiled_signals")
+    if compiled is None:  # pattern not loaded through load_io_patterns
+        compiled = pattern["_compiled_signals"] = _compile_signals(pattern)
+
     signals = []
-    for sig in pattern.get("signals", []):
-        suffix = sig.get("suffix", "")
-        signal = {
-            "io_point_id": str(uuid.uuid4()),
-            "signal_function": sig.get("function", "Status"),
-            "io_type": sig.get("io_type", "DI"),
-            "signal_type": sig.get("signal_type", "24V DC"),
-            "termination": "PLC",
-            "component_type": sig.get("component", ""),
-            "plc_tag": f"{base_tag}-{suffix}" if suffix else base_tag,
-            "field_tag": f"{base_tag}-{suffix}" if suffix else base_tag,
-            "suffix": suffix,
-            "description": sig.get("description", ""),
-            "protocol": sig.get("protocol"),
-            "marshalling": None,
-            "pattern_source": None,  # Set by caller
-            "electrical": {"feeder_type": feeder_type},
-        }
+    for tag_suffix, template in compiled:
+        signal_tag = base_tag + tag_suffix
+        signal = template.copy()
+        signal["io_point_id"] = _next_uuid()
+        signal["plc_tag"] = signal_tag
+        signal["field_tag"] = signal_tag
+        signal["pattern_source"] = pattern_name
+        signal["electrical"] = electrical
         signals.append(signal)
     return signals
 
 
+def flush_log(lines: list[str]) -> None:
+    """Write buffered progress lines to stdout in a single call."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+# Tag prefixes of instruments with no PLC IO, matched against the uppercased full_tag:
+#   - local gauges PG/TG/FG/LG/SG, as the whole first tag segment ("PG-101", "PG 3")
+#     but not as part of a longer code ("PGX-1")
+#   - manual valves VB (ball), BFV (butterfly), GV (gate), V-RN, NRV, CV-M (any continuation)
+#   - strainers, ST as the whole first tag segment
+_LOCAL_TAG_RE = re.compile(r"(?:PG|TG|FG|LG|SG)(?:\Z|[- ])|VB|BFV|GV|V-RN|NRV|CV-M|ST(?:\Z|-)")
+
+
+# Switch pattern by measured variable (LSH -> level_switch, PSL -> pressure_switch, ...)
+_SWITCH_PATTERNS = {
+    "L": "level_switch",
+    "P": "pressure_switch",
+    "T": "temperature_switch",
+    "F": "flow_switch",
+}
+
+
+# Succeeding letters that mark a field instrument: I=Indicate, T=Transmit, S=Switch
+_FIELD_FUNCTIONS = frozenset(("I", "T", "S"))
+
+# instrument_type values (lowercased) that mark a field instrument / a manual valve
+_FIELD_INST_TYPES = frozenset(("transmitter", "analyzer", "switch", "indicator", "gauge"))
+_MANUAL_VALVE_TYPES = frozenset(("ball valve", "manual valve", "gate valve", "butterfly valve",
+                                 "check valve", "non-return valve", "strainer"))
+
+# Raw instrument_type -> interned lowercase; the database repeats a handful of values
+_inst_type_cache: dict = {}
+
+
+def _lower_inst_type(raw) -> str:
+    """Return the interned lowercase form of an instrument_type value."""
+    if not raw:
+        return ""
+    lowered = _inst_type_cache.get(raw)
+    if lowered is None:
+        lowered = _inst_type_cache[raw] = sys.intern(raw.lower())
+    return lowered
+
+
+class _DecodedInstrument(NamedTuple):
+    """Fields of an instrument entry used for IO classification, read once."""
+    full_tag: str
+    inst_type: str  # lowercased instrument_type
+    variable: str
+    functions: frozenset  # ISA succeeding letters, for O(1) membership tests
+
+
+def _decode_inst(inst: dict) -> _DecodedInstrument:
+    """Pull the classification fields out of an instrument entry."""
+    tag_data = tag if isinstance(tag := inst.get("tag"), dict) else {}
+    return _DecodedInstrument(
+        full_tag=tag_data.get("full_tag") or "",
+        inst_type=_lower_inst_type(inst.get("instrument_type")),
+        variable=tag_data.get("variable", ""),
+        functions=frozenset(tag_data.get("functions") or ()),
+    )
+
+
 def is_local_instrument(inst: dict) -> bool:
     """Check if an instrument is local (no PLC IO).
 
@@ -256,37 +498,25 @@ def is_local_instrument(inst: dict) -> bool:
       - GV (Gate Valve, manual) — manual valve unless actuated
       - ST (Strainer) — passive device
     """
-    tag_data = inst.get("tag", {}) if isinstance(inst.get("tag"), dict) else {}
-    full_tag = (tag_data.get("full_tag", "") or "").strip()
-    functions = tag_data.get("functions", [])
-    variable = tag_data.get("variable", "")
-    inst_type = (inst.get("instrument_type") or "").lower()
+    return _is_local_decoded(_decode_inst(inst))
+
+
+def _is_local_decoded(decoded: _DecodedInstrument) -> bool:
+    """is_local_instrument on an already-decoded instrument."""
+    full_tag = decoded.full_tag.strip()
+    functions = decoded.functions
+    inst_type = decoded.inst_type
 
     # Local gauges: function is G (Gauge/Glass) only — no transmit/switch function
     if "G" in functions and "T" not in functions and "S" not in functions:
         return True
 
-    # Explicit local gauge tags
-    tag_upper = full_tag.upper().split("--")[0].split("-")[0] if full_tag else ""
-    local_prefixes = ("PG", "TG", "FG", "LG", "SG")
-    if tag_upper in local_prefixes:
-        return True
-    if any(full_tag.upper().startswith(p) for p in local_prefixes):
-        # But not PG that is part of a longer tag like PG-AIT
-        rest = full_tag.upper()[2:]
-        if not rest or rest.startswith("-") or rest.startswith(" "):
-            return True
-
-    # Manual valves: VB (ball), BFV (butterfly), GV (gate), V-RN
-    manual_valve_prefixes = ("VB", "BFV", "GV", "V-RN", "NRV", "CV-M")
-    if any(full_tag.upper().startswith(p) for p in manual_valve_prefixes):
-        return True
-    if inst_type in ("ball valve", "manual valve", "gate valve", "butterfly valve",
-                      "check valve", "non-return valve"):
+    # Local gauge, manual valve and strainer tag prefixes
+    if _LOCAL_TAG_RE.match(full_tag.upper()):
         return True
 
-    # Strainers
-    if tag_upper in ("ST",) or inst_type == "strainer":
+    # Manual valves and strainers by instrument type
+    if inst_type in _MANUAL_VALVE_TYPES:
         return True
 
     return False
@@ -305,34 +535,27 @@ def infer_field_instrument_pattern(inst: dict) -> str | None:
       - Local gauges (PG, TG, FG, LG) -> None (no IO)
       - Manual valves (VB, BFV, GV) -> None (no IO)
     """
+    decoded = _decode_inst(inst)
     # Exclude local instruments
-    if is_local_instrument(inst):
+    if _is_local_decoded(decoded):
         return None
+    return _infer_from_decoded(decoded)
+
 
-    tag_data = inst.get("tag", {}) if isinstance(inst.get("tag"), dict) else {}
-    functions = tag_data.get("functions", [])
-    variable = tag_data.get("variable", "")
-    full_tag = tag_data.get("full_tag", "")
+def _infer_from_decoded(decoded: _DecodedInstrument) -> str | None:
+    """infer_field_instrument_pattern for a decoded instrument already known not to be local."""
+    functions = decoded.functions
+    variable = decoded.variable
+    inst_type = decoded.inst_type
 
     # Transmitters: function list contains I and T, or instrument_type is Transmitter
-    inst_type = (inst.get("instrument_type") or "").lower()
-    if "T" in functions and "I" in functions:
-        return "transmitter_4_20"
-    if inst_type == "transmitter":
+    if ("T" in functions and "I" in functions) or inst_type == "transmitter":
         return "transmitter_4_20"
 
     # Switches — classify by measured variable
+    # Generic switch — default to level_switch as most common
     if "S" in functions:
-        if variable == "L":
-            return "level_switch"
-        if variable == "P":
-            return "pressure_switch"
-        if variable == "T":
-            return "temperature_switch"
-        if variable == "F":
-            return "flow_switch"
-        # Generic switch — default to level_switch as most common
-        return "level_switch"
+        return _SWITCH_PATTERNS.get(variable, "level_switch")
 
     # Valves: XV (actuated shut-off valve)
     if variable == "X" and "V" in functions:
@@ -346,7 +569,7 @@ def infer_field_instrument_pattern(inst: dict) -> str | None:
 
 
 def generate_motor_instruments(
-    equipment_list: list, database: dict, patterns: dict
+    resolved_equipment: list[tuple[dict, str, str | None]], database: dict, patterns: dict
 ) -> tuple[int, list[str]]:
     """Generate motor IO instruments for motorized equipment missing them.
 
@@ -354,11 +577,22 @@ def generate_motor_instruments(
     in the database, create a new instrument entry with tag {equipment_tag}-M and
     apply the appropriate motor pattern.
 
+    Args:
+        resolved_equipment: (equipment, pattern_name, feeder_display) for every
+            equipment entry get_pattern_for_equipment could map, in list order
+        database: Instrument database (new instruments are appended)
+        patterns: IO patterns dictionary
+
     Returns:
         Tuple of (count_generated, warnings)
     """
+    # Nothing motorized with a feeder_type: skip the scan of existing instruments
+    if not resolved_equipment:
+        return 0, []
+
     warnings = []
     generated = 0
+    log_lines = []
 
     # Build set of equipment tags that already have motor instruments
     existing_motor_tags = set()
@@ -369,42 +603,28 @@ def generate_motor_instruments(
         # Motor instruments have -M suffix or type "Motor Control"
         if full_tag.endswith("-M") or (inst.get("instrument_type") or "").lower() in ("motor control", "motor"):
             # Normalize the equipment tag
-            for normalized in normalize_equipment_tag(eq_tag):
+            for normalized in _normalize_equipment_tag_cached(eq_tag):
                 existing_motor_tags.add(normalized)
 
-    for eq in equipment_list:
-        tag = eq.get("tag", "")
-        feeder_type = (eq.get("feeder_type") or "").upper().strip()
-        if not feeder_type:
-            continue
-
-        eq_type = extract_equipment_type(tag)
-        if eq_type not in EQUIPMENT_PATTERN_MAP:
-            continue
+    for eq, pattern_name, feeder_display in resolved_equipment:
+        tag = eq["tag"]
 
         # Skip if motor instrument already exists (normalize to match slash/comma variants)
-        normalized_variants = normalize_equipment_tag(tag)
+        normalized_variants = _normalize_equipment_tag_cached(tag)
         if any(nt in existing_motor_tags for nt in normalized_variants):
             continue
 
-        # Determine pattern
-        pattern_name, feeder_display = get_pattern_for_equipment(eq)
-        if not pattern_name:
-            continue
-
         pattern = patterns.get(pattern_name)
         if not pattern:
             warnings.append(f"Pattern '{pattern_name}' not found for motor instrument on {tag}")
             continue
 
         motor_tag = f"{tag}-M"
-        io_signals = generate_io_signals(pattern, motor_tag, feeder_display)
-        for sig in io_signals:
-            sig["pattern_source"] = pattern_name
+        io_signals = generate_io_signals(pattern, motor_tag, feeder_display, pattern_name)
 
         # Create new instrument entry
         new_inst = {
-            "instrument_id": str(uuid.uuid4()),
+            "instrument_id": _next_uuid(),
             "equipment_tag": tag,
             "instrument_type": "Motor Control",
             "tag": {
@@ -428,13 +648,39 @@ def generate_motor_instruments(
         }
         database.setdefault("instruments", []).append(new_inst)
         generated += 1
-        print(f"  [motor] {motor_tag}: {pattern_name} [{feeder_display}] ({len(io_signals)} IO)")
+        log_lines.append(f"  [motor] {motor_tag}: {pattern_name} [{feeder_display}] ({len(io_signals)} IO)")
 
+    flush_log(log_lines)
     return generated, warnings
 
 
+def validate_equipment(equipment_list: list) -> list[str]:
+    """Return warnings for motorized/actuated equipment missing feeder_type.
+
+    Cheap enough to run before the IO patterns are loaded, so --strict can fail fast.
+    """
+    return [
+        f"Missing feeder_type for {tag} (required for IO generation)"
+        for eq in equipment_list
+        if (tag := eq.get("tag")) and not eq.get("feeder_type")
+        and extract_equipment_type(tag) in EQUIPMENT_PATTERN_MAP
+    ]
+
+
+def report_warnings(warnings: list[str], strict: bool) -> None:
+    """Print warnings; in strict mode any warning exits with status 1."""
+    if not warnings:
+        return
+    print(f"\nWarnings ({len(warnings)}):")
+    flush_log([f"  - {w}" for w in warnings])
+    if strict:
+        print("\nStrict mode: Exiting due to warnings.")
+        sys.exit(1)
+
+
 def apply_patterns(
-    database: dict, equipment_list: list, patterns: dict, strict: bool = True
+    database: dict, equipment_list: list, patterns: dict, strict: bool = True,
+    equipment_warnings: list[str] | None = None,
 ) -> tuple[dict, list[str]]:
     """
     Apply IO patterns to instruments based on equipment list.
@@ -444,38 +690,46 @@ def apply_patterns(
         equipment_list: List of equipment from equipment-list.qmd
         patterns: IO patterns dictionary
         strict: If True, report missing feeder_type as errors
+        equipment_warnings: validate_equipment() result if the caller already
+            has it (computed here when None)
 
     Returns:
         Tuple of (updated database, list of warnings/errors)
     """
-    warnings = []
+    if equipment_warnings is None:
+        equipment_warnings = validate_equipment(equipment_list)
+    warnings = list(equipment_warnings)
 
     # Build equipment tag -> equipment mapping with bidirectional pair resolution.
     # When a tag is paired (e.g. "202-B-01/02"), map both individual siblings
     # so instruments referencing either "202-B-01" or "202-B-02" resolve correctly.
+    # Resolved (eq, pattern_name, feeder_display) collected in the same pass and
+    # reused for motor instrument generation
     equipment_map = {}
-    _paired_tag_re = re.compile(r"^([A-Z]?\d{3,4}-[A-Z]{1,5}-)(\d+)((?:/\d+)+)$")
+    resolved_equipment = []
     for eq in equipment_list:
         tag = eq.get("tag", "")
         if not tag:
             continue
         equipment_map[tag] = eq
 
+        pattern_name, feeder_display = get_pattern_for_equipment(eq)
+        if pattern_name:
+            resolved_equipment.append((eq, pattern_name, feeder_display))
+
+        # Alias keys for this entry; earlier entries win on collisions
         # Index ALL normalized variants (comma-split + slash-stripped base tags)
         # so instruments referencing any variant resolve correctly (C2 fix)
-        for norm_tag in normalize_equipment_tag(tag):
-            equipment_map.setdefault(norm_tag, eq)
+        aliases = list(_normalize_equipment_tag_cached(tag))
 
         # Expand paired/triple tags: "202-B-01/02" → map "202-B-01", "202-B-02"
         # Also handles triple+: "500-P-01/02/03" → map "500-P-01", "500-P-02", "500-P-03"
-        m = _paired_tag_re.match(tag)
+        m = _PAIRED_TAG_RE.match(tag) if "/" in tag else None
         if m:
             prefix, first_seq, suffix_group = m.groups()
             all_seqs = [first_seq] + [s for s in suffix_group.split("/") if s]
             fmt_len = max(len(s) for s in all_seqs)
-            for seq in all_seqs:
-                individual_tag = f"{prefix}{seq.zfill(fmt_len)}"
-                equipment_map.setdefault(individual_tag, eq)
+            aliases.extend(f"{prefix}{seq.zfill(fmt_len)}" for seq in all_seqs)
 
         # Also check quantity_note for sister sequences (e.g. "1W + 1S" with tag 102-G-01)
         # and create alias for the inferred sibling (102-G-02)
@@ -487,44 +741,40 @@ def apply_patterns(
             quantity = 1
         if quantity >= 2 and "S" in qty_note.upper():
             # Infer sibling by incrementing the sequence number
-            sibling_match = re.match(r"^([A-Z]?\d{3,4}-[A-Z]{1,5}-)(\d+)$", tag)
+            sibling_match = _SEQUENCED_TAG_RE.match(tag)
             if sibling_match:
                 sib_prefix, sib_seq = sibling_match.groups()
-                for offset in range(1, quantity):
-                    sib_tag = f"{sib_prefix}{(int(sib_seq) + offset):0{len(sib_seq)}d}"
-                    equipment_map.setdefault(sib_tag, eq)
+                aliases.extend(
+                    f"{sib_prefix}{(int(sib_seq) + offset):0{len(sib_seq)}d}"
+                    for offset in range(1, quantity)
+                )
 
-    # Check for missing feeder_type in equipment list
-    for eq in equipment_list:
-        tag = eq.get("tag", "unknown")
-        if not eq.get("feeder_type"):
-            eq_type = extract_equipment_type(tag)
-            if eq_type in EQUIPMENT_PATTERN_MAP:
-                warnings.append(f"Missing feeder_type for {tag} (required for IO generation)")
+        for alias in aliases:
+            if alias not in equipment_map:
+                equipment_map[alias] = eq
 
     # Phase 0: Deduplicate instruments by full_tag (same instrument on multiple P&ID pages)
     # Keep the first occurrence (earliest page / highest confidence)
     instruments = database.get("instruments", [])
-    seen_tags: dict[str, int] = {}
+    seen_tags: set[str] = set()
+    kept = []
     dedup_removed = 0
-    for i, inst in enumerate(instruments):
-        tag_data = inst.get("tag", {})
-        ft = tag_data.get("full_tag", "") if isinstance(tag_data, dict) else str(tag_data)
-        if ft and ft in seen_tags:
-            dedup_removed += 1
-        elif ft:
-            seen_tags[ft] = i
+    for inst in instruments:
+        tag_data = inst.get("tag")
+        ft = tag_data.get("full_tag", "") if isinstance(tag_data, dict) else str(tag_data or "")
+        if ft:
+            if ft in seen_tags:
+                dedup_removed += 1
+                continue
+            seen_tags.add(ft)
+        kept.append(inst)
     if dedup_removed > 0:
-        database["instruments"] = [
-            inst for i, inst in enumerate(instruments)
-            if (inst.get("tag", {}).get("full_tag", "") if isinstance(inst.get("tag"), dict) else str(inst.get("tag", ""))) not in seen_tags
-            or seen_tags.get(inst.get("tag", {}).get("full_tag", "") if isinstance(inst.get("tag"), dict) else str(inst.get("tag", ""))) == i
-        ]
+        database["instruments"] = kept
         print(f"Dedup: removed {dedup_removed} duplicate instrument tags")
 
     # Phase 1: Generate motor instruments for motorized equipment
     print("\nGenerating motor instruments...")
-    motor_count, motor_warnings = generate_motor_instruments(equipment_list, database, patterns)
+    motor_count, motor_warnings = generate_motor_instruments(resolved_equipment, database, patterns)
     warnings.extend(motor_warnings)
     print(f"  Generated: {motor_count} motor instruments")
 
@@ -533,50 +783,57 @@ def apply_patterns(
     applied_count = 0
     skipped_count = 0
     field_fallback_count = 0
+    log_lines = []
 
-    for inst in database.get("instruments", []):
-        # Skip motor instruments we just generated
-        if (inst.get("provenance") or {}).get("extraction_source") == "motor_instrument_gen":
+    # (equipment_tag, instrument) pairs, unpacked straight into loop locals
+    candidates = [(inst.get("equipment_tag"), inst) for inst in database.get("instruments", [])]
+    for equipment_tag, inst in candidates:
+        is_motor_gen = (inst.get("provenance") or {}).get("extraction_source") == "motor_instrument_gen"
+
+        # Skip if instrument already has io_signals (checked first: the common case on re-runs)
+        if inst.get("io_signals"):
+            if not is_motor_gen:
+                skipped_count += 1
             continue
 
-        equipment_tag = inst.get("equipment_tag")
+        # Skip motor instruments we just generated
+        if is_motor_gen:
+            continue
 
-        # Skip if instrument already has io_signals
-        if inst.get("io_signals"):
-            skipped_count += 1
+        # Skip local instruments (PG, VB, etc.) — no PLC IO
+        decoded = _decode_inst(inst)
+        if _is_local_decoded(decoded):
             continue
 
         # Find matching equipment (try exact match, then normalized)
         equipment = None
         if equipment_tag:
             equipment = equipment_map.get(equipment_tag)
-            if not equipment:
-                # Try normalizing paired tags
-                for normalized_tag in normalize_equipment_tag(equipment_tag):
-                    equipment = equipment_map.get(normalized_tag)
-                    if equipment:
-                        break
-
-        base_tag = inst.get("tag", {}).get("full_tag", "") if isinstance(inst.get("tag"), dict) else ""
-
-        # Skip local instruments (PG, VB, etc.) — no PLC IO
-        if is_local_instrument(inst):
-            continue
+            if equipment is None and equipment_tag not in equipment_map:
+                # Try normalizing paired tags, then index the raw tag (hit or miss)
+                # so other instruments on the same equipment resolve in one lookup
+                equipment = next(
+                    (equipment_map[t] for t in _normalize_equipment_tag_cached(equipment_tag)
+                     if equipment_map.get(t) is not None),
+                    None,
+                )
+                equipment_map[equipment_tag] = equipment
+
+        base_tag = decoded.full_tag
 
         # Determine if this is a field instrument (transmitter, switch, valve)
         # vs. a motor-type instrument. Field instruments should NOT get motor patterns.
         is_field_instrument = False
-        inst_type = (inst.get("instrument_type") or "").lower()
-        tag_data = inst.get("tag", {}) if isinstance(inst.get("tag"), dict) else {}
-        variable = tag_data.get("variable", "")
-        functions = tag_data.get("functions", [])
+        inst_type = decoded.inst_type
+        variable = decoded.variable
+        functions = decoded.functions
 
-        if inst_type in ("transmitter", "analyzer", "switch", "indicator", "gauge"):
+        if inst_type in _FIELD_INST_TYPES:
             is_field_instrument = True
         elif variable in ("P", "T", "L", "F", "A", "S", "C", "Q"):
             # ISA variable letters for field measurements
             is_field_instrument = True
-        elif any(f in functions for f in ["I", "T", "S"]):
+        elif not functions.isdisjoint(_FIELD_FUNCTIONS):
             # I=Indicate, T=Transmit, S=Switch -> field instrument
             is_field_instrument = True
 
@@ -586,32 +843,29 @@ def apply_patterns(
             if pattern_name:
                 pattern = patterns.get(pattern_name)
                 if pattern:
-                    io_signals = generate_io_signals(pattern, base_tag, feeder_type)
-                    for sig in io_signals:
-                        sig["pattern_source"] = pattern_name
+                    io_signals = generate_io_signals(pattern, base_tag, feeder_type, pattern_name)
                     inst["io_signals"] = io_signals
                     applied_count += 1
-                    print(f"  {base_tag}: {pattern_name} [{feeder_type}] ({len(io_signals)} IO)")
+                    log_lines.append(f"  {base_tag}: {pattern_name} [{feeder_type}] ({len(io_signals)} IO)")
                     continue
                 else:
                     warnings.append(f"Pattern '{pattern_name}' not found in io-patterns.yaml")
 
         # Field instruments and fallback: infer from instrument type/functions
         # This also handles instruments with no equipment_tag (XV valves, TC controllers)
-        fallback_pattern_name = infer_field_instrument_pattern(inst)
+        fallback_pattern_name = _infer_from_decoded(decoded)
         if fallback_pattern_name:
             pattern = patterns.get(fallback_pattern_name)
             if pattern:
-                io_signals = generate_io_signals(pattern, base_tag, "Direct")
-                for sig in io_signals:
-                    sig["pattern_source"] = fallback_pattern_name
+                io_signals = generate_io_signals(pattern, base_tag, "Direct", fallback_pattern_name)
                 inst["io_signals"] = io_signals
                 field_fallback_count += 1
-                print(f"  {base_tag}: {fallback_pattern_name} [field-fallback] ({len(io_signals)} IO)")
+                log_lines.append(f"  {base_tag}: {fallback_pattern_name} [field-fallback] ({len(io_signals)} IO)")
                 continue
             else:
                 warnings.append(f"Inferred pattern '{fallback_pattern_name}' for '{base_tag}' not found in io-patterns.yaml — 0 IO assigned")
 
+    flush_log(log_lines)
     print(f"\nEquipment-matched: {applied_count} | Field-fallback: {field_fallback_count} | Skipped (existing): {skipped_count}")
 
     return database, warnings
@@ -626,6 +880,8 @@ def main():
     parser.add_argument("--patterns", "-p", help="Path to io-patterns.yaml (default: auto-detect)")
     parser.add_argument("--output", "-o", help="Output path (default: overwrite input)")
     parser.add_argument("--strict", action="store_true", help="Exit with error if feeder_type missing")
+    parser.add_argument("--cache", action="store_true",
+                        help="Keep a JSON cache beside the database YAML for faster reloads")
     args = parser.parse_args()
 
     database_path = Path(args.database)
@@ -650,36 +906,36 @@ def main():
         print(f"Error: Patterns file not found: {patterns_path}")
         sys.exit(1)
 
-    # Load data
-    print(f"Loading database: {database_path}")
-    database = load_yaml(database_path)
-
+    # Load data (equipment first so --strict can fail before the heavier loads)
     print(f"Loading equipment list: {equipment_path}")
     frontmatter = load_qmd_frontmatter(equipment_path)
     equipment_list = frontmatter.get("equipment", [])
     print(f"  Found {len(equipment_list)} equipment entries")
 
+    # Validated once: --strict fails fast here, apply_patterns reuses the result
+    equipment_warnings = validate_equipment(equipment_list)
+    if args.strict:
+        report_warnings(equipment_warnings, strict=True)
+
+    print(f"Loading database: {database_path}")
+    database = load_database(database_path, use_cache=args.cache)
+
     print(f"Loading IO patterns: {patterns_path}")
     patterns = load_io_patterns(patterns_path)
     print(f"  Found {len(patterns)} patterns")
 
     # Apply patterns
     print("\nApplying IO patterns...")
-    database, warnings = apply_patterns(database, equipment_list, patterns, args.strict)
+    database, warnings = apply_patterns(database, equipment_list, patterns, args.strict, equipment_warnings)
 
-    # Report warnings
-    if warnings:
-        print(f"\nWarnings ({len(warnings)}):")
-        for w in warnings:
-            print(f"  - {w}")
-        if args.strict:
-            print("\nStrict mode: Exiting due to warnings.")
-            sys.exit(1)
+    report_warnings(warnings, args.strict)
 
     # Save output
     output_path = Path(args.output) if args.output else database_path
-    with open(output_path, "w") as f:
-        yaml.dump(database, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+    save_yaml(database, output_path)
+    if args.cache:
+        # Written after the YAML so its mtime marks it as current
+        save_database_cache(database, output_path)
 
     print(f"\nSaved to: {output_path}")
 
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Shared instrument database loading for the scripts in this directory.
+
+Provides:
+- load_yaml: libyaml-backed YAML loading
+- load_database_stream: one-instrument-at-a-time loading for the generators
+- load_database / save_database_cache: the --cache JSON sidecar
+  (database.yaml.cache.json) used by apply_io_patterns and validate_database
+
+Not a CLI; the scripts import it as a sibling module.
+"""
+
+import json
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import yaml
+from yaml.composer import Composer
+from yaml.events import (
+    DocumentStartEvent, MappingEndEvent, MappingStartEvent, SequenceEndEvent, SequenceStartEvent,
+)
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
+try:
+    import orjson
+except ImportError:  # optional; --cache falls back to the stdlib json module
+    orjson = None
+
+
+def load_yaml(path: Path) -> dict:
+    """Load YAML file."""
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=_SafeLoader)
+
+
+class _StreamLoader(_SafeLoader, Composer):
+    """Database loader that composes one node at a time from the event stream."""
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.anchors = {}
+
+    def next_value(self):
+        """Compose and construct the next complete node in the stream."""
+        return self.construct_document(Composer.compose_node(self, None, None))
+
+
+def load_database_stream(path: Path, header_keys: Iterable[str] = ()) -> tuple[dict, Iterator[dict]]:
+    """
+    Open the database YAML for streaming.
+
+    Args:
+        path: Database YAML
+        header_keys: Top-level keys the caller needs before the first instrument
+
+    Returns:
+        Tuple of (header, instruments): header holds the top-level keys other
+        than "instruments" (project_id, revision, ...); instruments yields one
+        parsed instrument at a time, so the full list is never held in memory.
+        If any header_keys follow the instruments list, the instruments are
+        kept while the rest of the file is read, so it is still parsed once.
+    """
+    stream = _iter_database(path, frozenset(header_keys))
+    return next(stream), stream
+
+
+def _iter_database(path: Path, header_keys: frozenset[str]):
+    """Yield the header dict, then each instrument (see load_database_stream)."""
+    header = {}
+    pending = None  # instruments read before the header was complete
+    with open(path, "rb") as f:
+        loader = _StreamLoader(f)
+        try:
+            loader.get_event()  # StreamStart
+            if not (loader.check_event(DocumentStartEvent) and loader.get_event()
+                    and loader.check_event(MappingStartEvent)):
+                yield header  # empty document
+                return
+            loader.get_event()
+
+            header_sent = False
+            while not loader.check_event(MappingEndEvent):
+                key = loader.next_value()
+                if key == "instruments" and loader.check_event(SequenceStartEvent):
+                    loader.get_event()
+                    if header_keys <= header.keys():
+                        yield header
+                        header_sent = True
+                        while not loader.check_event(SequenceEndEvent):
+                            yield loader.next_value()
+                    else:
+                        pending = []
+                        while not loader.check_event(SequenceEndEvent):
+                            pending.append(loader.next_value())
+                    loader.get_event()
+                else:
+                    header[key] = loader.next_value()
+            if not header_sent:
+                yield header
+                yield from pending or ()
+        finally:
+            loader.dispose()
+
+
+def _cache_path(path: Path) -> Path:
+    """JSON cache written next to a database YAML by --cache."""
+    return path.with_name(path.name + ".cache.json")
+
+
+def load_database(path: Path, use_cache: bool = False) -> dict:
+    """Load the database YAML, or its JSON cache when --cache is set and it is current.
+
+    The cache is only trusted when it is at least as new as the YAML, so a
+    hand edit to the YAML always wins.
+    """
+    if use_cache:
+        cache = _cache_path(path)
+        try:
+            if cache.stat().st_mtime >= path.stat().st_mtime:
+                with open(cache, "rb") as f:
+                    data = f.read()
+                return orjson.loads(data) if orjson else json.loads(data)
+        except (OSError, ValueError):
+            pass  # missing, stale or corrupt cache: fall back to the YAML
+
+    database = load_yaml(path)
+    if use_cache:
+        save_database_cache(database, path)
+    return database
+
+
+def save_database_cache(database: dict, path: Path) -> None:
+    """Write the JSON cache for a database YAML (skipped if not JSON-representable)."""
+    try:
+        data = orjson.dumps(database) if orjson else json.dumps(database).encode("utf-8")
+        # Dates, non-string keys and NaN survive dumps() but not the round
+        # trip; a lossy cache would change the data
+        lossless = (orjson.loads(data) if orjson else json.loads(data)) == database
+    except (TypeError, ValueError):
+        lossless = False
+    if not lossless:
+        print(f"  Note: database not JSON-serializable, cache not written for {path}")
+        return
+    try:
+        with open(_cache_path(path), "wb") as f:
+            f.write(data)
+    except OSError as e:
+        print(f"  Note: could not write cache for {path}: {e}")
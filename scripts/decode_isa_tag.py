@@ -7,13 +7,17 @@ Parses instrument tags into structured components.
 Usage:
     python decode_isa_tag.py 200-FIT-01A
     python decode_isa_tag.py --tag "200-FIT-01A" --json
+
+The module type-checks cleanly under mypy and compiles unchanged with mypyc
+(``mypyc decode_isa_tag.py``) into a drop-in extension for bulk decoding.
 """
 
 import argparse
+import functools
 import json
 import re
 import sys
-from typing import Optional
+from typing import Iterable, Optional
 
 
 # ISA-5.1 First Letters (Measured Variable)
@@ -74,6 +78,9 @@ SUCCEEDING_LETTERS = {
     "Z": "Driver/Actuator",
 }
 
+# Tag pattern: {AREA}-{LETTERS}-{NUMBER}{SUFFIX}
+_TAG_RE = re.compile(r"^(\d{3})-([A-Z]+)-(\d+)([A-Z]?)$")
+
 # Category classification based on function letters
 CATEGORY_RULES = {
     "E": "primary",
@@ -85,6 +92,10 @@ CATEGORY_RULES = {
     "A": "safety",  # when combined with S (SIS)
 }
 
+# Trailing modifier letters (High, Low, Alarm)
+_MODIFIER_CHARS = frozenset("HLA")
+_SUCCEEDING_SET = frozenset(SUCCEEDING_LETTERS)
+
 
 def decode_tag(tag: str) -> Optional[dict]:
     """
@@ -96,9 +107,37 @@ def decode_tag(tag: str) -> Optional[dict]:
     Returns:
         Dictionary with decoded components, or None if invalid
     """
-    # Pattern: {AREA}-{LETTERS}-{NUMBER}{SUFFIX}
-    pattern = r"^(\d{3})-([A-Z]+)-(\d+)([A-Z]?)$"
-    match = re.match(pattern, tag.upper())
+    return _copy_decoded(_decode_upper(tag.upper()))
+
+
+def decode_tags(tags: Iterable[str]) -> list[Optional[dict]]:
+    """
+    Decode a batch of ISA-5.1 instrument tags.
+
+    Args:
+        tags: Full instrument tags
+
+    Returns:
+        One decode_tag() result per input tag, in order (None where invalid)
+    """
+    decode, copy = _decode_upper, _copy_decoded
+    return [copy(decode(tag.upper())) for tag in tags]
+
+
+def _copy_decoded(result: Optional[dict]) -> Optional[dict]:
+    """Copy a cached decode result so callers cannot modify the cached entry."""
+    if result is None:
+        return None
+    return {**result, "function_names": list(result["function_names"])}
+
+
+@functools.lru_cache(maxsize=4096)
+def _decode_upper(full_tag: str) -> Optional[dict]:
+    """Decode an already upper-cased tag (shared by decode_tag and decode_tags).
+
+    Results are cached per tag and must not be mutated; public callers get copies.
+    """
+    match = _TAG_RE.match(full_tag)
 
     if not match:
         return None
@@ -110,20 +149,13 @@ def decode_tag(tag: str) -> Optional[dict]:
         return None
 
     variable = letters[0]
-    function = ""
-    modifier = ""
 
-    # Extract function letters (IT, IC, T, etc.)
+    # Extract function letters (IT, IC, T, etc.); a trailing H, L or A is the modifier
     remaining = letters[1:]
-    i = 0
-    while i < len(remaining):
-        char = remaining[i]
-        # Check if this is a modifier (H, L, A at the end)
-        if char in ["H", "L", "A"] and i == len(remaining) - 1:
-            modifier = char
-        else:
-            function += char
-        i += 1
+    if remaining[-1] in _MODIFIER_CHARS:
+        function, modifier = remaining[:-1], remaining[-1]
+    else:
+        function, modifier = remaining, ""
 
     # Get variable name
     variable_name = FIRST_LETTERS.get(variable, "Unknown")
@@ -131,12 +163,8 @@ def decode_tag(tag: str) -> Optional[dict]:
     # Get function names
     function_names = [SUCCEEDING_LETTERS.get(c, "Unknown") for c in function]
 
-    # Determine category
-    category = "primary"
-    for func_char in function:
-        if func_char in CATEGORY_RULES:
-            category = CATEGORY_RULES[func_char]
-            break
+    # Determine category from the first function letter that has a rule
+    category = next((CATEGORY_RULES[c] for c in function if c in CATEGORY_RULES), "primary")
 
     # Construct loop_key (ISA 5.1: "{area}-{variable}-{loop_number}")
     loop_key = f"{area}-{variable}-{loop_number}"
@@ -152,7 +180,7 @@ def decode_tag(tag: str) -> Optional[dict]:
         "suffix": suffix,
         "category": category,
         "loop_key": loop_key,
-        "full_tag": tag.upper(),
+        "full_tag": full_tag,
     }
 
 
@@ -163,16 +191,17 @@ def validate_tag(tag: str) -> tuple[bool, str]:
     Returns:
         Tuple of (is_valid, error_message)
     """
-    result = decode_tag(tag)
+    result = _decode_upper(tag.upper())  # read-only, no copy needed
     if result is None:
         return False, f"Invalid tag format: {tag}"
 
     if result["variable"] not in FIRST_LETTERS:
         return False, f"Invalid first letter: {result['variable']}"
 
-    for c in result["function"]:
-        if c not in SUCCEEDING_LETTERS:
-            return False, f"Invalid function letter: {c}"
+    function = result["function"]
+    if not _SUCCEEDING_SET.issuperset(function):
+        invalid = next(c for c in function if c not in _SUCCEEDING_SET)
+        return False, f"Invalid function letter: {invalid}"
 
     return True, ""
 
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Shared Excel writer for the IO List and Instrument Index generators.
+
+Both sheets use the same layout: a merged title row, a merged revision row,
+a blank row, a header row (row 4) and one bordered data row per item. Each
+generator describes its columns with a SheetLayout and supplies the data rows.
+
+Not a CLI; the scripts import it as a sibling module.
+"""
+
+import argparse
+import importlib.util
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, NamedTuple
+
+# The Excel backends (openpyxl, xlsxwriter) are imported where they are used, so
+# importing this module does not pay for them; check_engine() confirms the
+# selected one is installed before the database is loaded.
+if TYPE_CHECKING:
+    from openpyxl import Workbook
+
+ENGINES = ("openpyxl", "xlsxwriter")
+
+
+class SheetLayout(NamedTuple):
+    """Column spec for one generated sheet."""
+    sheet_name: str
+    columns: list[tuple[str, int]]  # (header, width)
+    center_columns: frozenset[int]  # 1-based data columns that are center-aligned
+    wrap_columns: frozenset[int]  # 1-based long-text data columns that wrap
+
+
+def add_engine_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the --engine option shared by the generators."""
+    parser.add_argument("--engine", choices=ENGINES, default="openpyxl",
+                        help="Excel writer backend (xlsxwriter is faster on large databases)")
+
+
+def check_engine(engine: str) -> None:
+    """Exit with an install hint if the selected Excel backend is missing."""
+    if importlib.util.find_spec(engine) is None:
+        print(f"Error: {engine} not installed. Run: pip install {engine}")
+        sys.exit(1)
+
+
+def _revision_text(revision: dict) -> str:
+    return f"Revision: {revision.get('number', 'A')} | Date: {revision.get('date', '')} | By: {revision.get('by', '')}"
+
+
+def create_workbook(layout: SheetLayout, title: str, revision: dict, rows: Iterable[list]) -> "Workbook":
+    """
+    Create the workbook with openpyxl.
+
+    Uses openpyxl's write-only mode: rows are streamed out as they are appended,
+    so memory stays flat however many rows there are.
+
+    Args:
+        layout: Sheet name and column spec
+        title: Title row text
+        revision: Revision info
+        rows: One list of values per data row, in column order
+
+    Returns:
+        openpyxl Workbook
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, Border, Side, Alignment, PatternFill, NamedStyle
+    from openpyxl.styles.fonts import DEFAULT_FONT
+    from openpyxl.utils import get_column_letter
+
+    columns = layout.columns
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(layout.sheet_name)
+
+    # Styles
+    header_font = Font(bold=True, size=10)
+    header_fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
+    thin_border = Border(
+        left=Side(style="thin"),
+        right=Side(style="thin"),
+        top=Side(style="thin"),
+        bottom=Side(style="thin"),
+    )
+    center_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    left_align = Alignment(horizontal="left", vertical="center", wrap_text=True)
+    # Data cells only wrap in the long-text columns
+    center_nowrap = Alignment(horizontal="center", vertical="center")
+    left_nowrap = Alignment(horizontal="left", vertical="center")
+
+    # Sheet layout must be set before the first row is appended
+    for col, (_, width) in enumerate(columns, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+    ws.freeze_panes = "A5"
+    last_letter = get_column_letter(len(columns))
+    ws.merged_cells.add(f"A1:{last_letter}1")  # Title row
+    ws.merged_cells.add(f"A2:{last_letter}2")  # Revision row
+
+    def styled_cell(value, font=None, fill=None, border=None, alignment=None) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        if font:
+            cell.font = font
+        if fill:
+            cell.fill = fill
+        if border:
+            cell.border = border
+        if alignment:
+            cell.alignment = alignment
+        return cell
+
+    # Title row
+    ws.append([styled_cell(title, font=Font(bold=True, size=14), alignment=center_align)])
+
+    # Revision row
+    ws.append([styled_cell(_revision_text(revision), alignment=center_align)])
+    ws.append([])
+
+    # Header row (row 4)
+    ws.append([
+        styled_cell(name, font=header_font, fill=header_fill, border=thin_border, alignment=center_align)
+        for name, _ in columns
+    ])
+
+    # Data cell styles, registered once and assigned by name
+    wb.add_named_style(NamedStyle(name="data_center", font=DEFAULT_FONT, border=thin_border, alignment=center_nowrap))
+    wb.add_named_style(NamedStyle(name="data_left", font=DEFAULT_FONT, border=thin_border, alignment=left_nowrap))
+    wb.add_named_style(NamedStyle(name="data_wrap", font=DEFAULT_FONT, border=thin_border, alignment=left_align))
+    column_styles = [
+        "data_wrap" if col in layout.wrap_columns else "data_center" if col in layout.center_columns else "data_left"
+        for col in range(1, len(columns) + 1)
+    ]
+
+    for data in rows:
+        row = []
+        for value, style in zip(data, column_styles):
+            cell = WriteOnlyCell(ws, value=value or "")
+            cell.style = style
+            row.append(cell)
+        ws.append(row)
+
+    return wb
+
+
+def write_workbook_xlsxwriter(layout: SheetLayout, title: str, revision: dict, rows: Iterable[list],
+                              output_path: Path) -> None:
+    """
+    Write the workbook straight to output_path with xlsxwriter.
+
+    Same layout as create_workbook. constant_memory mode flushes each row to
+    disk once the next one starts, so rows must be written in order.
+    """
+    import xlsxwriter
+
+    columns = layout.columns
+    wb = xlsxwriter.Workbook(str(output_path), {
+        "constant_memory": True,
+        "strings_to_numbers": False,
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+    })
+    ws = wb.add_worksheet(layout.sheet_name)
+
+    # Formats (created once, shared by every cell)
+    title_fmt = wb.add_format({"bold": True, "font_size": 14, "align": "center", "valign": "vcenter", "text_wrap": True})
+    revision_fmt = wb.add_format({"align": "center", "valign": "vcenter", "text_wrap": True})
+    header_fmt = wb.add_format({"bold": True, "font_size": 10, "bg_color": "#D9D9D9", "border": 1,
+                                "align": "center", "valign": "vcenter", "text_wrap": True})
+    center_fmt = wb.add_format({"border": 1, "align": "center", "valign": "vcenter"})
+    left_fmt = wb.add_format({"border": 1, "align": "left", "valign": "vcenter"})
+    wrap_fmt = wb.add_format({"border": 1, "align": "left", "valign": "vcenter", "text_wrap": True})
+
+    for col, (_, width) in enumerate(columns):
+        ws.set_column(col, col, width)
+    ws.freeze_panes(4, 0)
+
+    last_col = len(columns) - 1
+    ws.merge_range(0, 0, 0, last_col, title, title_fmt)
+    ws.merge_range(1, 0, 1, last_col, _revision_text(revision), revision_fmt)
+
+    # Header row (row 4)
+    ws.write_row(3, 0, [name for name, _ in columns], header_fmt)
+
+    column_fmts = [
+        wrap_fmt if col in layout.wrap_columns else center_fmt if col in layout.center_columns else left_fmt
+        for col in range(1, len(columns) + 1)
+    ]
+    for row_num, data in enumerate(rows, 4):
+        for col, (value, fmt) in enumerate(zip(data, column_fmts)):
+            ws.write(row_num, col, value or "", fmt)
+
+    wb.close()
+
+
+def save_workbook(engine: str, layout: SheetLayout, title: str, revision: dict, rows: Iterable[list],
+                  output_path: Path) -> None:
+    """Write the sheet to output_path with the selected --engine."""
+    if engine == "xlsxwriter":
+        write_workbook_xlsxwriter(layout, title, revision, rows, output_path)
+    else:
+        create_workbook(layout, title, revision, rows).save(output_path)
@@ -7,27 +7,25 @@ Creates a 19-column Excel file matching standard instrument index format.
 Usage:
     python generate_instrument_index.py --database database.yaml
     python generate_instrument_index.py -d database.yaml -o instrument-index.xlsx
+    python generate_instrument_index.py -d database.yaml --engine xlsxwriter
 """
 
 import argparse
+import re
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
 
-import yaml
+# Shared with the other scripts in this directory
+from database_io import load_database_stream
+import excel_export
 
-try:
+if TYPE_CHECKING:
     from openpyxl import Workbook
-    from openpyxl.styles import Font, Border, Side, Alignment, PatternFill
-    from openpyxl.utils import get_column_letter
-except ImportError:
-    print("Error: openpyxl not installed. Run: pip install openpyxl")
-    sys.exit(1)
 
 
-def load_yaml(path: Path) -> dict:
-    """Load YAML file."""
-    with open(path) as f:
-        return yaml.safe_load(f)
+# "0-100 degC" style range string -> (min, max, unit)
+_RANGE_RE = re.compile(r"([\d.]+)\s*[-–]\s*([\d.]+)\s*(.*)")
 
 
 # Column definitions for Instrument Index
@@ -53,82 +51,40 @@ COLUMNS = [
     ("REMARKS", 30),
 ]
 
+# Center-aligned data columns (1-based): item number, units, ranges, alarms, PLC scaling
+CENTER_COLUMNS = frozenset((1, 10, 11, 12, 13, 14, 15, 16, 17, 18))
+# Long-text data columns (1-based) that wrap: SERVICE DESCRIPTION, REMARKS
+WRAP_COLUMNS = frozenset((3, 19))
 
-def create_workbook(instruments: list, project_id: str, revision: dict) -> Workbook:
-    """
-    Create Instrument Index workbook.
+LAYOUT = excel_export.SheetLayout("Instrument Index", COLUMNS, CENTER_COLUMNS, WRAP_COLUMNS)
 
-    Args:
-        instruments: List of instrument entries
-        project_id: Project identifier
-        revision: Revision info
 
-    Returns:
-        openpyxl Workbook
-    """
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Instrument Index"
-
-    # Styles
-    header_font = Font(bold=True, size=10)
-    header_fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-    thin_border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin"),
-    )
-    center_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    left_align = Alignment(horizontal="left", vertical="center", wrap_text=True)
-
-    # Title row
-    ws.merge_cells("A1:S1")
-    ws["A1"] = f"INSTRUMENT INDEX - {project_id}"
-    ws["A1"].font = Font(bold=True, size=14)
-    ws["A1"].alignment = center_align
-
-    # Revision row
-    ws.merge_cells("A2:S2")
-    ws["A2"] = f"Revision: {revision.get('number', 'A')} | Date: {revision.get('date', '')} | By: {revision.get('by', '')}"
-    ws["A2"].alignment = center_align
-
-    # Header row (row 4)
-    header_row = 4
-    for col, (name, width) in enumerate(COLUMNS, 1):
-        cell = ws.cell(row=header_row, column=col, value=name)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.border = thin_border
-        cell.alignment = center_align
-        ws.column_dimensions[get_column_letter(col)].width = width
-
-    # Data rows
+def iter_data_rows(instruments: Iterable[dict]):
+    """Yield one list of COLUMNS values per instrument, in database order."""
     for item_no, inst in enumerate(instruments, 1):
-        row = header_row + item_no
-        tag = inst.get("tag", {}) if isinstance(inst.get("tag"), dict) else {}
+        get = inst.get
+        tag = tag if isinstance(tag := get("tag"), dict) else {}
         # Map to actual YAML schema fields (flat structure, not nested objects)
         # instrument_type, range, output_signal, area etc. are top-level fields
 
         # Primary signal type
-        signal_type = inst.get("primary_signal_type", "")
+        signal_type = get("primary_signal_type", "")
         # Derive from io_signals if not set
         if not signal_type:
-            io_signals = inst.get("io_signals", [])
+            io_signals = get("io_signals", [])
             if io_signals:
                 first_sig = io_signals[0]
                 signal_type = first_sig.get("signal_type", first_sig.get("io_type", ""))
 
         # Range fields — check top-level and nested
-        range_val = inst.get("range", "")
-        range_unit = inst.get("range_unit", "")
-        range_min = inst.get("range_min", "")
-        range_max = inst.get("range_max", "")
+        range_val = get("range", "")
+        range_unit = get("range_unit", "")
+        range_min = get("range_min", "")
+        range_max = get("range_max", "")
 
         # Parse "0-100 degC" style range string into min/max/unit
         if range_val and not range_min and not range_max:
-            import re as _re
-            range_match = _re.match(r"([\d.]+)\s*[-–]\s*([\d.]+)\s*(.*)", str(range_val))
+            range_match = _RANGE_RE.match(str(range_val))
             if range_match:
                 range_min = range_match.group(1)
                 range_max = range_match.group(2)
@@ -136,57 +92,60 @@ def create_workbook(instruments: list, project_id: str, revision: dict) -> Workb
                     range_unit = range_match.group(3).strip()
 
         # Location — check top-level area and location fields
-        area = tag.get("area", inst.get("area", ""))
-        pid_ref = inst.get("pid_reference", inst.get("source_pid", ""))
-        location_str = inst.get("location", "")
+        area = tag.get("area", get("area", ""))
+        pid_ref = get("pid_reference", get("source_pid", ""))
+        location_str = get("location", "")
         if isinstance(location_str, dict):
             pid_ref = pid_ref or location_str.get("pid_reference", "")
             location_str = location_str.get("physical_location", "")
 
-        data = [
+        yield [
             item_no,
             tag.get("full_tag", ""),
-            inst.get("service_description", inst.get("service", "")),
+            get("service_description", get("service", "")),
             pid_ref,
-            inst.get("equipment_tag", ""),
+            get("equipment_tag", ""),
             location_str if isinstance(location_str, str) else str(area),
-            inst.get("manufacturer", ""),
-            inst.get("instrument_type", inst.get("type", "")),
+            get("manufacturer", ""),
+            get("instrument_type", get("type", "")),
             signal_type,
             range_unit,
             range_min,
             range_max,
-            inst.get("alarm_lolo", ""),
-            inst.get("alarm_lo", ""),
-            inst.get("alarm_hi", ""),
-            inst.get("alarm_hihi", ""),
+            get("alarm_lolo", ""),
+            get("alarm_lo", ""),
+            get("alarm_hi", ""),
+            get("alarm_hihi", ""),
             range_min,  # PLC 4mA = range_min
             range_max,  # PLC 20mA = range_max
-            inst.get("remarks", ""),
+            get("remarks", ""),
         ]
 
-        for col, value in enumerate(data, 1):
-            cell = ws.cell(row=row, column=col, value=value if value else "")
-            cell.border = thin_border
-            if col == 1:  # Item number
-                cell.alignment = center_align
-            elif col in [10, 11, 12, 13, 14, 15, 16, 17, 18]:  # Numeric
-                cell.alignment = center_align
-            else:
-                cell.alignment = left_align
 
-    # Freeze header
-    ws.freeze_panes = "A5"
+def create_workbook(instruments: Iterable[dict], project_id: str, revision: dict) -> "Workbook":
+    """
+    Create Instrument Index workbook (openpyxl, write-only; see excel_export.create_workbook).
+
+    Args:
+        instruments: List of instrument entries
+        project_id: Project identifier
+        revision: Revision info
 
-    return wb
+    Returns:
+        openpyxl Workbook
+    """
+    return excel_export.create_workbook(LAYOUT, f"INSTRUMENT INDEX - {project_id}", revision, iter_data_rows(instruments))
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate Instrument Index Excel")
     parser.add_argument("--database", "-d", required=True, help="Path to database YAML")
     parser.add_argument("--output", "-o", help="Output Excel path")
+    excel_export.add_engine_argument(parser)
     args = parser.parse_args()
 
+    excel_export.check_engine(args.engine)
+
     database_path = Path(args.database)
     if not database_path.exists():
         print(f"Error: Database file not found: {database_path}")
@@ -194,13 +153,19 @@ def main():
 
     # Load database
     print(f"Loading database: {database_path}")
-    database = load_yaml(database_path)
+    header, instruments = load_database_stream(database_path, ("project_id", "revision"))
 
-    instruments = database.get("instruments", [])
-    project_id = database.get("project_id", "UNKNOWN")
-    revision = database.get("revision", {})
+    project_id = header.get("project_id", "UNKNOWN")
+    revision = header.get("revision", {})
 
-    print(f"Found {len(instruments)} instruments")
+    # Count instruments as they stream past
+    count = 0
+
+    def counted(instruments: Iterable[dict]) -> Iterator[dict]:
+        nonlocal count
+        for inst in instruments:
+            count += 1
+            yield inst
 
     # Generate output path
     if args.output:
@@ -208,11 +173,10 @@ def main():
     else:
         output_path = database_path.parent / "instrument-index.xlsx"
 
-    # Create workbook
-    wb = create_workbook(instruments, project_id, revision)
-
-    # Save
-    wb.save(output_path)
+    # Create and save workbook
+    excel_export.save_workbook(args.engine, LAYOUT, f"INSTRUMENT INDEX - {project_id}", revision,
+                               iter_data_rows(counted(instruments)), output_path)
+    print(f"Found {count} instruments")
     print(f"Saved: {output_path}")
 
 
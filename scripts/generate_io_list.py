@@ -7,27 +7,20 @@ Creates a 17-column Excel file matching standard IO list format.
 Usage:
     python generate_io_list.py --database database.yaml
     python generate_io_list.py -d database.yaml -o io-list.xlsx
+    python generate_io_list.py -d database.yaml --engine xlsxwriter
 """
 
 import argparse
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
 
-import yaml
+# Shared with the other scripts in this directory
+from database_io import load_database_stream
+import excel_export
 
-try:
+if TYPE_CHECKING:
     from openpyxl import Workbook
-    from openpyxl.styles import Font, Border, Side, Alignment, PatternFill
-    from openpyxl.utils import get_column_letter
-except ImportError:
-    print("Error: openpyxl not installed. Run: pip install openpyxl")
-    sys.exit(1)
-
-
-def load_yaml(path: Path) -> dict:
-    """Load YAML file."""
-    with open(path) as f:
-        return yaml.safe_load(f)
 
 
 # Column definitions for IO List
@@ -52,72 +45,40 @@ COLUMNS = [
     ("Remarks", 25),
 ]
 
+# Center-aligned data columns (1-based): Area, ISA symbols, S.No., Signal Type, I/O Type
+CENTER_COLUMNS = frozenset((1, 2, 3, 4, 11, 12))
+# Long-text data columns (1-based) that wrap: Service Description, Component Description, Remarks
+WRAP_COLUMNS = frozenset((7, 8, 18))
 
-def get_signal_category(io_type: str) -> str:
-    """Return 'Digital' or 'Analog' based on io_type."""
-    if io_type in ["DI", "DO"]:
-        return "Digital"
-    elif io_type in ["AI", "AO"]:
-        return "Analog"
-    elif io_type in ["PI", "PO"]:
-        return "Protocol"
-    return ""
+LAYOUT = excel_export.SheetLayout("IO List", COLUMNS, CENTER_COLUMNS, WRAP_COLUMNS)
 
 
-def create_workbook(instruments: list, project_id: str, revision: dict) -> Workbook:
-    """
-    Create IO List workbook.
+# Signal category per io_type
+_SIGNAL_CATEGORY = {
+    "DI": "Digital",
+    "DO": "Digital",
+    "AI": "Analog",
+    "AO": "Analog",
+    "PI": "Protocol",
+    "PO": "Protocol",
+}
 
-    Args:
-        instruments: List of instrument entries
-        project_id: Project identifier
-        revision: Revision info
 
-    Returns:
-        openpyxl Workbook
-    """
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "IO List"
-
-    # Styles
-    header_font = Font(bold=True, size=10)
-    header_fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-    thin_border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin"),
-    )
-    center_align = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    left_align = Alignment(horizontal="left", vertical="center", wrap_text=True)
-
-    # Title row (18 columns now)
-    ws.merge_cells("A1:R1")
-    ws["A1"] = f"IO LIST - {project_id}"
-    ws["A1"].font = Font(bold=True, size=14)
-    ws["A1"].alignment = center_align
-
-    # Revision row
-    ws.merge_cells("A2:R2")
-    ws["A2"] = f"Revision: {revision.get('number', 'A')} | Date: {revision.get('date', '')} | By: {revision.get('by', '')}"
-    ws["A2"].alignment = center_align
-
-    # Header row (row 4)
-    header_row = 4
-    for col, (name, width) in enumerate(COLUMNS, 1):
-        cell = ws.cell(row=header_row, column=col, value=name)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.border = thin_border
-        cell.alignment = center_align
-        ws.column_dimensions[get_column_letter(col)].width = width
-
-    # Data rows - one row per IO signal
-    row_num = header_row
+def get_signal_category(io_type: str) -> str:
+    """Return 'Digital', 'Analog' or 'Protocol' based on io_type."""
+    return _SIGNAL_CATEGORY.get(io_type, "")
+
+
+def iter_data_rows(instruments: Iterable[dict]):
+    """Yield one list of COLUMNS values per IO signal, in database order."""
     item_no = 0
 
     for inst in instruments:
+        io_signals = inst.get("io_signals", [])
+
+        if not io_signals:
+            continue
+
         tag = inst.get("tag", {})
         if not isinstance(tag, dict):
             tag = {"full_tag": str(tag or "")}
@@ -125,100 +86,94 @@ def create_workbook(instruments: list, project_id: str, revision: dict) -> Workb
         # Handle location as string or dict
         if isinstance(location, str):
             location = {"physical_location": location, "pid_reference": ""}
-        io_signals = inst.get("io_signals", [])
 
-        if not io_signals:
-            continue
+        # Instrument-level values, shared by every signal row of this instrument
+        area = tag.get("area", "")
+        full_tag = tag.get("full_tag", "")
+        pid_reference = location.get("pid_reference", "")
+        physical_location = location.get("physical_location", "")
+
+        # Get service description (handle both field names)
+        service_desc = inst.get("service_description", "") or inst.get("service", "")
+        inst_component = inst.get("component", "")
+        inst_feeder_type = inst.get("feeder_type", "")
+
+        # ISA symbols: field = variable + field function (e.g., FT, LIT, PIT)
+        #              PLC  = variable + control function (e.g., FIC, LIC)
+        variable = tag.get("variable", "")
+        functions = tag.get("functions", [])
+        # Field symbol: variable + transmit/switch function (T, S, E, etc.)
+        field_funcs = [f for f in functions if f in ("T", "S", "E", "V", "Y")]
+        isa_field = variable + "".join(field_funcs) if variable else ""
+        # PLC symbol: variable + control/indicate functions (I, C, A, etc.)
+        plc_funcs = [f for f in functions if f in ("I", "C", "A", "R")]
+        isa_plc = variable + "".join(plc_funcs) if variable else ""
+        # Fallback: if no specific functions found, use variable only
+        if not isa_field:
+            isa_field = variable
+        if not isa_plc:
+            isa_plc = variable
 
         for signal in io_signals:
             item_no += 1
-            row_num += 1
+            get = signal.get
 
-            io_type = signal.get("io_type", "")
-            signal_category = get_signal_category(io_type)
+            io_type = get("io_type", "")
 
-            # Get feeder type from electrical object
-            electrical = signal.get("electrical", {})
-            feeder_type = electrical.get("feeder_type", "") if electrical else ""
+            # Get feeder type from electrical object, else from instrument level
+            electrical = get("electrical", {})
+            feeder_type = (electrical.get("feeder_type", "") if electrical else "") or inst_feeder_type
 
             # Build full tag with suffix if available
-            suffix = signal.get("suffix", "")
-            full_tag = tag.get("full_tag", "")
+            suffix = get("suffix", "")
             field_tag = f"{full_tag}-{suffix}" if suffix else full_tag
 
-            # Get service description (handle both field names)
-            service_desc = inst.get("service_description", "") or inst.get("service", "")
-
-            # Get signal function (handle both field names)
-            sig_function = signal.get("signal_function", "") or signal.get("function", "")
-
-            # Get component description
-            component_desc = signal.get("component_type", "") or signal.get("component", "") or inst.get("component", "")
-
-            # Get feeder type from instrument level if not in signal
-            if not feeder_type:
-                feeder_type = inst.get("feeder_type", "")
-
-            # ISA symbols: field = variable + field function (e.g., FT, LIT, PIT)
-            #              PLC  = variable + control function (e.g., FIC, LIC)
-            variable = tag.get("variable", "")
-            functions = tag.get("functions", [])
-            # Field symbol: variable + transmit/switch function (T, S, E, etc.)
-            field_funcs = [f for f in functions if f in ("T", "S", "E", "V", "Y")]
-            isa_field = variable + "".join(field_funcs) if variable else ""
-            # PLC symbol: variable + control/indicate functions (I, C, A, etc.)
-            plc_funcs = [f for f in functions if f in ("I", "C", "A", "R")]
-            isa_plc = variable + "".join(plc_funcs) if variable else ""
-            # Fallback: if no specific functions found, use variable only
-            if not isa_field:
-                isa_field = variable
-            if not isa_plc:
-                isa_plc = variable
-
-            # PLC tag vs field tag distinction
-            plc_tag = signal.get("plc_tag", field_tag)
-
-            data = [
-                tag.get("area", ""),
+            yield [
+                area,
                 isa_plc,   # ISA PLC symbol (e.g., FIC, LIC)
                 isa_field,  # ISA Field symbol (e.g., FT, LIT)
                 item_no,
-                plc_tag,    # PLC Tag Number
+                get("plc_tag", field_tag),  # PLC Tag Number (vs field tag)
                 field_tag,  # Field Tag Number
                 service_desc,
-                component_desc,
-                location.get("pid_reference", ""),
-                location.get("physical_location", ""),
-                signal_category,
+                get("component_type", "") or get("component", "") or inst_component,
+                pid_reference,
+                physical_location,
+                _SIGNAL_CATEGORY.get(io_type, ""),  # same as get_signal_category()
                 io_type,
-                signal.get("signal_type", ""),
-                signal.get("termination", ""),
-                sig_function,
+                get("signal_type", ""),
+                get("termination", ""),
+                get("signal_function", "") or get("function", ""),  # handle both field names
                 feeder_type,  # Electrical feeder type (DOL, VFD, etc.)
-                signal.get("pattern_source", ""),  # IO pattern used
-                signal.get("description", ""),
+                get("pattern_source", ""),  # IO pattern used
+                get("description", ""),
             ]
 
-            for col, value in enumerate(data, 1):
-                cell = ws.cell(row=row_num, column=col, value=value if value else "")
-                cell.border = thin_border
-                if col in [1, 2, 3, 4, 11, 12]:  # Center-aligned
-                    cell.alignment = center_align
-                else:
-                    cell.alignment = left_align
 
-    # Freeze header
-    ws.freeze_panes = "A5"
+def create_workbook(instruments: Iterable[dict], project_id: str, revision: dict) -> "Workbook":
+    """
+    Create IO List workbook (openpyxl, write-only; see excel_export.create_workbook).
 
-    return wb
+    Args:
+        instruments: List of instrument entries
+        project_id: Project identifier
+        revision: Revision info
+
+    Returns:
+        openpyxl Workbook
+    """
+    return excel_export.create_workbook(LAYOUT, f"IO LIST - {project_id}", revision, iter_data_rows(instruments))
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate IO List Excel")
     parser.add_argument("--database", "-d", required=True, help="Path to database YAML")
     parser.add_argument("--output", "-o", help="Output Excel path")
+    excel_export.add_engine_argument(parser)
     args = parser.parse_args()
 
+    excel_export.check_engine(args.engine)
+
     database_path = Path(args.database)
     if not database_path.exists():
         print(f"Error: Database file not found: {database_path}")
@@ -226,15 +181,20 @@ def main():
 
     # Load database
     print(f"Loading database: {database_path}")
-    database = load_yaml(database_path)
+    header, instruments = load_database_stream(database_path, ("project_id", "revision"))
 
-    instruments = database.get("instruments", [])
-    project_id = database.get("project_id", "UNKNOWN")
-    revision = database.get("revision", {})
+    project_id = header.get("project_id", "UNKNOWN")
+    revision = header.get("revision", {})
 
-    # Count IO signals
-    total_signals = sum(len(inst.get("io_signals", [])) for inst in instruments)
-    print(f"Found {len(instruments)} instruments with {total_signals} IO signals")
+    # Count instruments and IO signals as they stream past
+    instrument_count = signal_count = 0
+
+    def counted(instruments: Iterable[dict]) -> Iterator[dict]:
+        nonlocal instrument_count, signal_count
+        for inst in instruments:
+            instrument_count += 1
+            signal_count += len(inst.get("io_signals") or [])
+            yield inst
 
     # Generate output path
     if args.output:
@@ -242,11 +202,10 @@ def main():
     else:
         output_path = database_path.parent / "io-list.xlsx"
 
-    # Create workbook
-    wb = create_workbook(instruments, project_id, revision)
-
-    # Save
-    wb.save(output_path)
+    # Create and save workbook
+    excel_export.save_workbook(args.engine, LAYOUT, f"IO LIST - {project_id}", revision,
+                               iter_data_rows(counted(instruments)), output_path)
+    print(f"Found {instrument_count} instruments with {signal_count} IO signals")
     print(f"Saved: {output_path}")
 
 
@@ -12,10 +12,16 @@ Usage:
 import argparse
 import math
 import sys
+from collections import Counter
 from pathlib import Path
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
 try:
     from openpyxl import Workbook
     from openpyxl.styles import Font, Border, Side, Alignment, PatternFill
@@ -27,8 +33,8 @@ except ImportError:
 
 def load_yaml(path: Path) -> dict:
     """Load YAML file."""
-    with open(path) as f:
-        return yaml.safe_load(f)
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=_SafeLoader)
 
 
 def count_io_types(instruments: list) -> dict:
@@ -41,15 +47,12 @@ def count_io_types(instruments: list) -> dict:
     Returns:
         Dict with counts for each IO type
     """
-    counts = {"DI": 0, "DO": 0, "AI": 0, "AO": 0, "PI": 0, "PO": 0}
-
-    for inst in instruments:
-        for signal in (inst.get("io_signals") or []):
-            io_type = signal.get("io_type", "")
-            if io_type in counts:
-                counts[io_type] += 1
-
-    return counts
+    counts = Counter(
+        signal.get("io_type")
+        for inst in instruments
+        for signal in (inst.get("io_signals") or [])
+    )
+    return {io_type: counts[io_type] for io_type in ("DI", "DO", "AI", "AO", "PI", "PO")}
 
 
 def create_workbook(counts: dict, spare_pct: float, project_id: str, revision: dict) -> Workbook:
@@ -80,6 +83,7 @@ def create_workbook(counts: dict, spare_pct: float, project_id: str, revision: d
     )
     center_align = Alignment(horizontal="center", vertical="center")
     right_align = Alignment(horizontal="right", vertical="center")
+    bold_font = Font(bold=True)
 
     # Title row
     ws.merge_cells("A1:F1")
@@ -128,7 +132,7 @@ def create_workbook(counts: dict, spare_pct: float, project_id: str, revision: d
             cell.border = thin_border
             if col == 1:
                 cell.alignment = center_align
-                cell.font = Font(bold=True)
+                cell.font = bold_font
             else:
                 cell.alignment = right_align
 
@@ -147,7 +151,7 @@ def create_workbook(counts: dict, spare_pct: float, project_id: str, revision: d
     for col in range(1, 7):
         cell = ws.cell(row=row, column=col)
         cell.border = thin_border
-        cell.font = Font(bold=True)
+        cell.font = bold_font
         if col == 1:
             cell.alignment = center_align
         else:
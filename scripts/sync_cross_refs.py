@@ -22,6 +22,26 @@ from collections import defaultdict
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper
+
+
+# Trailing paired suffixes: 200-B-01/02/03 -> /02/03
+_SLASH_SUFFIX_RE = re.compile(r"(/\d+)+$")
+# Paired/multi tag split into (prefix, first sequence, /NN... group)
+_SLASH_SPLIT_RE = re.compile(r"^(.*?-)(\d+)((?:/\d+)+)$")
+# Trailing description: "200-T-06 (Digester Tank No. 6)" -> " (Digester Tank No. 6)"
+_DESCR_RE = re.compile(r"\s*\(.*\)\s*$")
+# Paired tag split into (base, last /NN) for auto-fix strategy 1
+_PAIRED_SUFFIX_RE = re.compile(r"^(.+?)(/\d+)+$")
+# ISA equipment tag: (prefix, code, sequence)
+_ISA_TAG_RE = re.compile(r"^([A-Z]?\d{3,4})-([A-Z]{1,5})-(\d+)$")
+
+# Sentinel for dict lookups where None is a valid stored value
+_MISSING = object()
+
 
 def _expand_equipment_tags(equipment_list: list) -> set:
     """Build expanded set of equipment tags including slash-sibling variants.
@@ -40,10 +60,10 @@ def _expand_equipment_tags(equipment_list: list) -> set:
         tags.add(raw)
         for part in raw.split(","):
             part = part.strip()
-            base = re.sub(r"(/\d+)+$", "", part)
+            base = _SLASH_SUFFIX_RE.sub("", part)
             if base:
                 tags.add(base)
-            m = re.match(r"^(.*?-)(\d+)((?:/\d+)+)$", part)
+            m = _SLASH_SPLIT_RE.match(part)
             if m:
                 prefix, first_seq, rest = m.groups()
                 for seq in [first_seq] + [s for s in rest.split("/") if s]:
@@ -53,8 +73,8 @@ def _expand_equipment_tags(equipment_list: list) -> set:
 
 def load_yaml(path: Path) -> dict:
     """Load YAML file."""
-    with open(path) as f:
-        return yaml.safe_load(f)
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=_SafeLoader)
 
 
 def load_qmd_frontmatter(path: Path) -> dict:
@@ -62,11 +82,145 @@ def load_qmd_frontmatter(path: Path) -> dict:
     with open(path) as f:
         content = f.read()
 
-    parts = content.split("---")
-    if len(parts) < 3:
+    # Slice out the text between the first two "---" markers without
+    # splitting the document body
+    start = content.find("---")
+    end = content.find("---", start + 3) if start >= 0 else -1
+    if end < 0:
         raise ValueError(f"Invalid QMD format in {path}")
 
-    return yaml.safe_load(parts[1])
+    return yaml.load(content[start + 3:end], Loader=_SafeLoader)
+
+
+# Check names accepted by validate_all(checks=...)
+ALL_CHECKS = frozenset(("pid", "equipment", "loop", "io", "tag"))
+
+
+def validate_all(database: dict, equipment_tags: set | None = None, checks=ALL_CHECKS) -> dict:
+    """
+    Run the cross-reference checks in a single pass over the instruments.
+
+    Args:
+        database: Instrument database
+        equipment_tags: Expanded equipment tags (see _expand_equipment_tags);
+            equipment references are not checked when None
+        checks: Names of the checks to run (default: all); skipped checks
+            return empty lists
+
+    Returns:
+        Dict of error lists keyed by check: "pid", "equipment", "loop", "io", "tag"
+    """
+    check_pid = "pid" in checks
+    check_equip = "equipment" in checks and equipment_tags is not None
+    check_loop = "loop" in checks
+    check_io = "io" in checks
+    check_tag = "tag" in checks
+
+    errors_pid = []
+    errors_equip = []
+    errors_loop = []
+    errors_io = []
+    errors_tag = []
+
+    source_pids = {pid for p in database.get("source_pids", []) if (pid := p.get("pid_number"))}
+
+    # Map each valid loop_key from the loops collection to its variable
+    loop_variables = {}
+    for loop in (database.get("loops", []) if check_loop else ()):
+        loop_key = loop.get("loop_key")
+        if not loop_key:
+            errors_loop.append("Loop missing required loop_key field")
+            continue
+
+        if loop_key in loop_variables:
+            errors_loop.append(f"Duplicate loop_key: {loop_key}")
+        else:
+            loop_variables[loop_key] = loop.get("variable", "")
+
+    io_point_ids = {}
+
+    for inst in database.get("instruments", []):
+        tag_data = inst.get("tag", {})
+        is_dict_tag = isinstance(tag_data, dict)
+        if is_dict_tag:
+            tag = tag_data.get("full_tag", "unknown")
+            inst_variable = tag_data.get("variable", "")
+        else:
+            tag = str(tag_data or "unknown")
+            inst_variable = ""
+
+        # P&ID reference
+        if check_pid:
+            pid_ref = inst.get("location", {}).get("pid_reference")
+            if pid_ref and pid_ref not in source_pids:
+                errors_pid.append(f"{tag}: P&ID '{pid_ref}' not in source_pids")
+
+        # Equipment reference
+        if check_equip:
+            equipment_tag = inst.get("equipment_tag")
+            if equipment_tag:
+                # Strip descriptions: "200-T-06 (Digester Tank No. 6)" → "200-T-06"
+                # (str(): YAML may load a bare tag such as 101 as an int)
+                cleaned = _DESCR_RE.sub("", str(equipment_tag)).strip()
+                base = _SLASH_SUFFIX_RE.sub("", cleaned)
+                if cleaned not in equipment_tags and base not in equipment_tags:
+                    errors_equip.append(f"{tag}: References unknown equipment '{equipment_tag}'")
+
+        # Loop reference and variable consistency
+        if check_loop:
+            loop_key = inst.get("loop_key")
+            if not loop_key:
+                errors_loop.append(f"{tag}: Missing required loop_key field")
+            elif (expected_variable := loop_variables.get(loop_key, _MISSING)) is _MISSING:
+                errors_loop.append(f"{tag}: References non-existent loop_key '{loop_key}'")
+            elif expected_variable and inst_variable != expected_variable:
+                errors_loop.append(
+                    f"{tag}: Variable '{inst_variable}' doesn't match loop variable '{expected_variable}'"
+                )
+
+        # IO point uniqueness
+        if check_io:
+            for signal in inst.get("io_signals", []):
+                io_id = signal.get("io_point_id")
+                if io_id:
+                    if io_id in io_point_ids:
+                        errors_io.append(
+                            f"Duplicate io_point_id '{io_id}' in {tag} (also in {io_point_ids[io_id]})"
+                        )
+                    else:
+                        io_point_ids[io_id] = tag
+
+        # Tag structure (non-dict tags cannot be checked)
+        if check_tag and is_dict_tag:
+            full_tag = tag_data.get("full_tag", "")
+            if full_tag:
+                expected = _expected_full_tag(tag_data)
+                # Exact match is the common case and needs no upper() copies
+                if full_tag != expected and full_tag.upper() != expected.upper():
+                    errors_tag.append(f"Tag mismatch: {full_tag} vs computed {expected}")
+
+    return {
+        "pid": errors_pid,
+        "equipment": errors_equip,
+        "loop": errors_loop,
+        "io": errors_io,
+        "tag": errors_tag,
+    }
+
+
+def _expected_full_tag(tag: dict) -> str:
+    """Reconstruct full_tag from parts in ISA format: VARIABLE+FUNCTION+MODIFIER-AREA-LOOP(-SUFFIX)."""
+    get = tag.get
+    variable = get('variable', '')
+    function = get('function', '')
+    modifier = get('modifier', '')
+
+    # Join the non-empty parts with "-" directly instead of via a filtered list
+    expected = f"{variable}{function}{modifier}" if variable or function or modifier else ""
+    for part in (get('area', ''), get('loop_number', ''), get('suffix', '')):
+        if part:
+            expected = f"{expected}-{part}" if expected else f"{part}"
+    return expected
 
 
 def validate_equipment_refs(database: dict, equipment_list: list) -> list:
@@ -80,23 +234,9 @@ def validate_equipment_refs(database: dict, equipment_list: list) -> list:
     Returns:
         List of validation errors
     """
-    errors = []
     # Build expanded set from equipment list (handle slash/comma tags + siblings)
     equipment_tags = _expand_equipment_tags(equipment_list)
-
-    for inst in database.get("instruments", []):
-        tag_data = inst.get("tag", {})
-        tag = tag_data.get("full_tag", "unknown") if isinstance(tag_data, dict) else str(tag_data or "unknown")
-        equipment_tag = inst.get("equipment_tag")
-
-        if equipment_tag:
-            # Strip descriptions: "200-T-06 (Digester Tank No. 6)" → "200-T-06"
-            cleaned = re.sub(r'\s*\(.*\)\s*$', '', equipment_tag).strip()
-            base = re.sub(r"(/\d+)+$", "", cleaned)
-            if cleaned not in equipment_tags and base not in equipment_tags:
-                errors.append(f"{tag}: References unknown equipment '{equipment_tag}'")
-
-    return errors
+    return validate_all(database, equipment_tags, checks={"equipment"})["equipment"]
 
 
 def validate_pid_refs(database: dict) -> list:
@@ -109,18 +249,7 @@ def validate_pid_refs(database: dict) -> list:
     Returns:
         List of validation errors
     """
-    errors = []
-    source_pids = {p.get("pid_number") for p in database.get("source_pids", [])}
-
-    for inst in database.get("instruments", []):
-        tag_data = inst.get("tag", {})
-        tag = tag_data.get("full_tag", "unknown") if isinstance(tag_data, dict) else str(tag_data or "unknown")
-        pid_ref = inst.get("location", {}).get("pid_reference")
-
-        if pid_ref and pid_ref not in source_pids:
-            errors.append(f"{tag}: P&ID '{pid_ref}' not in source_pids")
-
-    return errors
+    return validate_all(database, checks={"pid"})["pid"]
 
 
 def validate_loop_keys(database: dict) -> list:
@@ -138,52 +267,7 @@ def validate_loop_keys(database: dict) -> list:
     Returns:
         List of validation errors
     """
-    errors = []
-
-    # Build set of valid loop_keys from loops collection
-    loops = database.get("loops", [])
-    valid_loop_keys = set()
-    loop_variables = {}
-
-    for loop in loops:
-        loop_key = loop.get("loop_key")
-        if not loop_key:
-            errors.append("Loop missing required loop_key field")
-            continue
-
-        if loop_key in valid_loop_keys:
-            errors.append(f"Duplicate loop_key: {loop_key}")
-        else:
-            valid_loop_keys.add(loop_key)
-            loop_variables[loop_key] = loop.get("variable", "")
-
-    # Validate instrument references to loops
-    for inst in database.get("instruments", []):
-        tag_data = inst.get("tag", {})
-        if isinstance(tag_data, dict):
-            full_tag = tag_data.get("full_tag", "unknown")
-            inst_variable = tag_data.get("variable", "")
-        else:
-            full_tag = str(tag_data or "unknown")
-            inst_variable = ""
-        loop_key = inst.get("loop_key")
-
-        if not loop_key:
-            errors.append(f"{full_tag}: Missing required loop_key field")
-            continue
-
-        if loop_key not in valid_loop_keys:
-            errors.append(f"{full_tag}: References non-existent loop_key '{loop_key}'")
-            continue
-
-        # Check variable consistency
-        expected_variable = loop_variables.get(loop_key, "")
-        if expected_variable and inst_variable != expected_variable:
-            errors.append(
-                f"{full_tag}: Variable '{inst_variable}' doesn't match loop variable '{expected_variable}'"
-            )
-
-    return errors
+    return validate_all(database, checks={"loop"})["loop"]
 
 
 def validate_io_points(database: dict) -> list:
@@ -196,22 +280,7 @@ def validate_io_points(database: dict) -> list:
     Returns:
         List of validation errors
     """
-    errors = []
-    io_point_ids = {}
-
-    for inst in database.get("instruments", []):
-        tag_data = inst.get("tag", {})
-        tag = tag_data.get("full_tag", "unknown") if isinstance(tag_data, dict) else str(tag_data or "unknown")
-
-        for signal in inst.get("io_signals", []):
-            io_id = signal.get("io_point_id")
-            if io_id:
-                if io_id in io_point_ids:
-                    errors.append(f"Duplicate io_point_id '{io_id}' in {tag} (also in {io_point_ids[io_id]})")
-                else:
-                    io_point_ids[io_id] = tag
-
-    return errors
+    return validate_all(database, checks={"io"})["io"]
 
 
 def validate_tag_consistency(database: dict) -> list:
@@ -224,33 +293,13 @@ def validate_tag_consistency(database: dict) -> list:
     Returns:
         List of validation errors
     """
-    errors = []
-
-    for inst in database.get("instruments", []):
-        tag = inst.get("tag", {})
-        if not isinstance(tag, dict):
-            continue  # Cannot validate tag consistency for non-dict tags
-        full_tag = tag.get("full_tag", "")
+    return validate_all(database, checks={"tag"})["tag"]
 
-        if full_tag:
-            # Reconstruct from parts in ISA format: VARIABLE+FUNCTION+MODIFIER-AREA-LOOP(-SUFFIX)
-            variable = tag.get('variable', '')
-            function = tag.get('function', '')
-            modifier = tag.get('modifier', '')
-            area = tag.get('area', '')
-            loop_number = tag.get('loop_number', '')
-            suffix = tag.get('suffix', '')
 
-            func_letters = f"{variable}{function}{modifier}"
-            parts = [p for p in [func_letters, area, loop_number] if p]
-            expected = "-".join(parts)
-            if suffix:
-                expected = f"{expected}-{suffix}" if expected else suffix
-
-            if full_tag.upper() != expected.upper():
-                errors.append(f"Tag mismatch: {full_tag} vs computed {expected}")
-
-    return errors
+def _fix_label(inst: dict) -> str:
+    """Instrument tag for auto-fix messages, only looked up when a message is produced."""
+    tag_data = inst.get("tag")
+    return tag_data.get("full_tag", "unknown") if isinstance(tag_data, dict) else "unknown"
 
 
 def apply_auto_fixes(database: dict, equipment_tags: set) -> tuple[int, list[str]]:
@@ -264,9 +313,6 @@ def apply_auto_fixes(database: dict, equipment_tags: set) -> tuple[int, list[str
     Returns:
         (fix_count, fix_messages)
     """
-    PAIRED_SUFFIX_RE = re.compile(r"^(.+?)(/\d+)+$")
-    ISA_TAG_RE = re.compile(r"^([A-Z]?\d{3,4})-([A-Z]{1,5})-(\d+)$")
-
     fix_count = 0
     messages = []
 
@@ -275,26 +321,27 @@ def apply_auto_fixes(database: dict, equipment_tags: set) -> tuple[int, list[str
         if not equip_tag or equip_tag in equipment_tags:
             continue
 
-        full_tag = inst.get("tag", {}).get("full_tag", "unknown") if isinstance(inst.get("tag"), dict) else "unknown"
         original_ref = equip_tag
 
         # Strategy 1: Strip /XX paired suffix
-        m = PAIRED_SUFFIX_RE.match(equip_tag)
+        m = _PAIRED_SUFFIX_RE.match(equip_tag)
         if m:
             base_tag = m.group(1)
             if base_tag in equipment_tags:
                 inst["equipment_tag"] = base_tag
                 fix_count += 1
-                messages.append(f"  [fix] {full_tag}: '{original_ref}' → '{base_tag}' (stripped paired suffix)")
+                messages.append(
+                    f"  [fix] {_fix_label(inst)}: '{original_ref}' → '{base_tag}' (stripped paired suffix)"
+                )
                 continue
 
         # Strategy 2: Try sibling offsets (±1, ±2) for ISA-format tags
-        m = ISA_TAG_RE.match(equip_tag)
+        m = _ISA_TAG_RE.match(equip_tag)
         if m:
             prefix, code, seq_str = m.groups()
             seq = int(seq_str)
             fmt_len = len(seq_str)
-            for offset in [1, -1, 2, -2]:
+            for offset in (1, -1, 2, -2):
                 sibling_seq = seq + offset
                 if sibling_seq < 1:
                     continue
@@ -302,27 +349,38 @@ def apply_auto_fixes(database: dict, equipment_tags: set) -> tuple[int, list[str
                 if sibling_tag in equipment_tags:
                     inst["equipment_tag"] = sibling_tag
                     fix_count += 1
-                    messages.append(f"  [fix] {full_tag}: '{original_ref}' → '{sibling_tag}' (sibling offset {offset:+d})")
+                    messages.append(
+                        f"  [fix] {_fix_label(inst)}: '{original_ref}' → '{sibling_tag}' (sibling offset {offset:+d})"
+                    )
                     break
-            else:
-                # No sibling found via offset — continue to strategy 3
-                pass
-            if inst["equipment_tag"] != original_ref:
-                continue
+            # ISA tags without a sibling match are left for validation to report
+            continue
 
         # Strategy 3: Normalize non-ISA descriptive tags to nearest equipment
         # e.g. "AIR/DIRT SEPARATOR" or "FEED TANK" → try to find equipment with matching description
-        if not ISA_TAG_RE.match(equip_tag):
-            # Non-ISA tag — not auto-fixable, leave as-is with info message
-            messages.append(f"  [info] {full_tag}: non-ISA equipment_tag '{original_ref}' — skipped (manual review)")
+        # Non-ISA tag — not auto-fixable, leave as-is with info message
+        messages.append(f"  [info] {_fix_label(inst)}: non-ISA equipment_tag '{original_ref}' — skipped (manual review)")
 
     return fix_count, messages
 
 
+def _report(errors: list, label: str = "issues", quiet: bool = False) -> None:
+    """Print one check's errors (only their count if quiet), or OK when there are none."""
+    if not errors:
+        print("  OK")
+    elif quiet:
+        print(f"  Found {len(errors)} {label}")
+    else:
+        # One write per section instead of one print per error
+        sys.stdout.write(f"  Found {len(errors)} {label}:\n    - " + "\n    - ".join(errors) + "\n")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Validate cross-references in instrument database")
     parser.add_argument("--database", "-d", required=True, help="Path to database YAML")
     parser.add_argument("--equipment", "-e", help="Path to equipment-list.qmd or equipment-list.yaml")
+    parser.add_argument("--quiet", "-q", action="store_true",
+                        help="Only print issue counts, not the individual issues")
     parser.add_argument("--fix", action="store_true", help="Attempt to auto-fix orphan equipment references")
     args = parser.parse_args()
 
@@ -334,94 +392,77 @@ def main():
     print(f"Loading database: {database_path}")
     database = load_yaml(database_path)
 
+    # Load the equipment list and apply auto-fixes up front so that every
+    # check can run in one pass over the instruments
+    equipment_path = Path(args.equipment) if args.equipment else None
+    equipment_tags = None
+    equipment_error = None
+    fix_result = None
+    if equipment_path and equipment_path.exists():
+        try:
+            # Support both QMD and plain YAML formats
+            if equipment_path.suffix == '.qmd':
+                frontmatter = load_qmd_frontmatter(equipment_path)
+            else:
+                frontmatter = load_yaml(equipment_path)
+            equipment_list = frontmatter.get("equipment", [])
+            equipment_tags = _expand_equipment_tags(equipment_list)
+
+            # Auto-fix orphan references before validation if --fix is set
+            if args.fix:
+                fix_result = apply_auto_fixes(database, equipment_tags)
+                if fix_result[0] > 0:
+                    # Save the fixed database
+                    with open(database_path, "w") as f:
+                        yaml.dump(database, f, Dumper=_SafeDumper, default_flow_style=False,
+                                  sort_keys=False, allow_unicode=True)
+        except Exception as e:
+            equipment_tags = None
+            equipment_error = e
+
+    results = validate_all(database, equipment_tags)
     all_errors = []
 
     # Validate P&ID references
     print("\nValidating P&ID references...")
-    errors = validate_pid_refs(database)
-    if errors:
-        print(f"  Found {len(errors)} issues:")
-        for e in errors:
-            print(f"    - {e}")
-    else:
-        print("  OK")
-    all_errors.extend(errors)
+    _report(results["pid"], quiet=args.quiet)
+    all_errors.extend(results["pid"])
 
     # Validate equipment references if equipment list provided
-    if args.equipment:
-        equipment_path = Path(args.equipment)
-        if equipment_path.exists():
-            print(f"\nValidating equipment references...")
-            try:
-                # Support both QMD and plain YAML formats
-                if equipment_path.suffix == '.qmd':
-                    frontmatter = load_qmd_frontmatter(equipment_path)
-                else:
-                    frontmatter = load_yaml(equipment_path)
-                equipment_list = frontmatter.get("equipment", [])
-                equipment_tags = _expand_equipment_tags(equipment_list)
-
-                # Auto-fix orphan references before validation if --fix is set
-                if args.fix:
-                    print("\n  Applying auto-fixes for orphan equipment references...")
-                    fix_count, fix_messages = apply_auto_fixes(database, equipment_tags)
-                    for msg in fix_messages:
-                        print(msg)
-                    if fix_count > 0:
-                        print(f"  Fixed {fix_count} orphan reference(s)")
-                        # Save the fixed database
-                        with open(database_path, "w") as f:
-                            yaml.dump(database, f, default_flow_style=False,
-                                      sort_keys=False, allow_unicode=True)
-                        print(f"  Saved fixed database to: {database_path}")
-                    else:
-                        print("  No auto-fixable orphans found")
-
-                errors = validate_equipment_refs(database, equipment_list)
-                if errors:
-                    print(f"  Found {len(errors)} remaining issues:")
-                    for e in errors:
-                        print(f"    - {e}")
-                else:
-                    print("  OK")
-                all_errors.extend(errors)
-            except Exception as e:
-                print(f"  Warning: Could not load equipment list: {e}")
+    if equipment_path and equipment_path.exists():
+        print("\nValidating equipment references...")
+        if fix_result is not None:
+            fix_count, fix_messages = fix_result
+            print("\n  Applying auto-fixes for orphan equipment references...")
+            if fix_messages and not args.quiet:
+                sys.stdout.write("\n".join(fix_messages) + "\n")
+            if fix_count > 0:
+                print(f"  Fixed {fix_count} orphan reference(s)")
+                print(f"  Saved fixed database to: {database_path}")
+            else:
+                print("  No auto-fixable orphans found")
+        if equipment_error is not None:
+            print(f"  Warning: Could not load equipment list: {equipment_error}")
         else:
-            print(f"Warning: Equipment file not found: {equipment_path}")
+            _report(results["equipment"], "remaining issues", args.quiet)
+            all_errors.extend(results["equipment"])
+    elif equipment_path:
+        print(f"Warning: Equipment file not found: {equipment_path}")
 
     # Validate loop keys
     print("\nValidating loop keys...")
-    errors = validate_loop_keys(database)
-    if errors:
-        print(f"  Found {len(errors)} issues:")
-        for e in errors:
-            print(f"    - {e}")
-    else:
-        print("  OK")
-    all_errors.extend(errors)
+    _report(results["loop"], quiet=args.quiet)
+    all_errors.extend(results["loop"])
 
     # Validate IO points
     print("\nValidating IO point IDs...")
-    errors = validate_io_points(database)
-    if errors:
-        print(f"  Found {len(errors)} issues:")
-        for e in errors:
-            print(f"    - {e}")
-    else:
-        print("  OK")
-    all_errors.extend(errors)
+    _report(results["io"], quiet=args.quiet)
+    all_errors.extend(results["io"])
 
     # Validate tag consistency
     print("\nValidating tag consistency...")
-    errors = validate_tag_consistency(database)
-    if errors:
-        print(f"  Found {len(errors)} issues:")
-        for e in errors:
-            print(f"    - {e}")
-    else:
-        print("  OK")
-    all_errors.extend(errors)
+    _report(results["tag"], quiet=args.quiet)
+    all_errors.extend(results["tag"])
 
     # Summary
     print(f"\n{'=' * 50}")
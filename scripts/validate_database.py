@@ -5,27 +5,122 @@ Validate instrument database against schema.
 Usage:
     python validate_database.py --database database.yaml
     python validate_database.py --database database.yaml --strict
+    python validate_database.py -d database.yaml --fast-fail  # first schema error only
+    python validate_database.py -d "projects/**/database.yaml" other.yaml --jobs 4
+    python validate_database.py -d database.yaml --cache  # reuse database.yaml.cache.json
 """
 
 import argparse
+import contextlib
+import functools
+import glob
+import io
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Iterable, Iterator
+
 import yaml
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
+# Shared with the other scripts in this directory (--cache JSON sidecar)
+from database_io import load_database
+
 try:
     from jsonschema import validate, ValidationError, Draft202012Validator
 except ImportError:
     print("Error: jsonschema not installed. Run: pip install jsonschema")
     sys.exit(1)
 
+try:
+    import fastjsonschema
+except ImportError:  # optional; schema checks fall back to jsonschema alone
+    fastjsonschema = None
+
 
 def load_yaml(path: Path) -> dict:
     """Load YAML file."""
-    with open(path) as f:
-        return yaml.safe_load(f)
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=_SafeLoader)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_schema(schema_path: str) -> dict:
+    """Load a schema once per process (shared by both validator backends)."""
+    return load_yaml(Path(schema_path))
+
+
+@functools.lru_cache(maxsize=4)
+def _schema_validator(schema_path: str) -> Draft202012Validator:
+    """Load a schema and build its validator once per process."""
+    return Draft202012Validator(_load_schema(schema_path))
+
+
+def _schema_formats(node) -> set:
+    """Collect every "format" keyword value used in a schema."""
+    if isinstance(node, dict):
+        found = {node["format"]} if isinstance(node.get("format"), str) else set()
+        for value in node.values():
+            found |= _schema_formats(value)
+        return found
+    if isinstance(node, list):
+        return set().union(*map(_schema_formats, node))
+    return set()
+
+
+@functools.lru_cache(maxsize=4)
+def _compiled_schema(schema_path: str):
+    """Compile a schema with fastjsonschema, or None if unavailable or unsupported."""
+    if fastjsonschema is None:
+        return None
+    schema = _load_schema(schema_path)
+    # jsonschema runs without a format checker, so formats are annotations
+    # only; accept any string for them here too
+    formats = dict.fromkeys(_schema_formats(schema), ".*")
+    try:
+        # use_default=False: never fill schema defaults into the database
+        return fastjsonschema.compile(schema, formats=formats, use_default=False)
+    except Exception:  # unsupported keyword, unresolvable $ref, ...
+        return None
 
 
-def validate_database(database_path: Path, schema_path: Path, strict: bool = False) -> list:
+def _passes_compiled_schema(schema_path: str, database: dict) -> bool:
+    """True if the fastjsonschema-compiled schema accepts the database.
+
+    Only used as a fast path for valid databases: any rejection (including
+    stricter format checks) falls through to jsonschema, which remains the
+    authority for both the verdict and the error messages.
+    """
+    compiled = _compiled_schema(schema_path)
+    if compiled is None:
+        return False
+    try:
+        compiled(database)
+    except fastjsonschema.JsonSchemaException:
+        return False
+    return True
+
+
+def _find_duplicates(values: Iterable) -> list:
+    """Return values seen more than once, in order of first repeat (falsy values are skipped)."""
+    seen = set()
+    duplicates = {}  # dict keeps insertion order
+    for value in values:
+        if not value:
+            continue
+        if value in seen:
+            duplicates[value] = None
+        else:
+            seen.add(value)
+    return list(duplicates)
+
+
+def validate_database(database_path: Path, schema_path: Path, strict: bool = False,
+                      use_cache: bool = False, fast_fail: bool = False) -> list:
     """
     Validate database against schema.
 
@@ -33,6 +128,8 @@ def validate_database(database_path: Path, schema_path: Path, strict: bool = Fal
         database_path: Path to instrument database YAML
         schema_path: Path to schema YAML
         strict: If True, fail on warnings
+        use_cache: If True, load through the JSON cache beside the database
+        fast_fail: If True, report only the first schema error
 
     Returns:
         List of validation errors/warnings
@@ -41,18 +138,26 @@ def validate_database(database_path: Path, schema_path: Path, strict: bool = Fal
 
     # Load files
     try:
-        database = load_yaml(database_path)
+        database = load_database(database_path, use_cache)
     except Exception as e:
         return [f"Failed to load database: {e}"]
 
     try:
-        schema = load_yaml(schema_path)
+        validator = _schema_validator(str(schema_path))
     except Exception as e:
         return [f"Failed to load schema: {e}"]
 
     # JSON Schema validation
-    validator = Draft202012Validator(schema)
-    for error in validator.iter_errors(database):
+    schema_errors: Iterator[ValidationError]
+    if _passes_compiled_schema(str(schema_path), database):
+        schema_errors = iter(())
+    else:
+        schema_errors = validator.iter_errors(database)
+    if fast_fail:
+        # Stop at the first violation instead of walking the whole tree
+        first_error = next(schema_errors, None)
+        schema_errors = iter((first_error,)) if first_error is not None else iter(())
+    for error in schema_errors:
         path = ".".join(str(p) for p in error.absolute_path)
         errors.append(f"Schema error at {path}: {error.message}")
 
@@ -63,81 +168,143 @@ def validate_database(database_path: Path, schema_path: Path, strict: bool = Fal
     instruments = database.get("instruments", [])
 
     # Check for duplicate instrument_ids
-    ids = [i.get("instrument_id") for i in instruments if i.get("instrument_id")]
-    duplicates = set(x for x in ids if ids.count(x) > 1)
-    for dup in duplicates:
+    for dup in _find_duplicates(i.get("instrument_id") for i in instruments):
         errors.append(f"Duplicate instrument_id: {dup}")
 
     # Check for duplicate full_tags
-    tags = [i.get("tag", {}).get("full_tag") for i in instruments if isinstance(i.get("tag"), dict)]
-    dup_tags = set(x for x in tags if x and tags.count(x) > 1)
-    for dup in dup_tags:
+    tags = (tag.get("full_tag") for i in instruments if isinstance(tag := i.get("tag"), dict))
+    for dup in _find_duplicates(tags):
         errors.append(f"Duplicate full_tag: {dup}")
 
-    # Validate tag structure matches full_tag
-    for inst in instruments:
-        tag = inst.get("tag", {})
-        if not isinstance(tag, dict):
-            continue
-        full_tag = tag.get("full_tag", "")
-        if full_tag:
-            expected = f"{tag.get('area', '')}-{tag.get('variable', '')}{tag.get('function', '')}{tag.get('modifier', '')}-{tag.get('loop_number', '')}{tag.get('suffix', '')}"
-            if full_tag != expected:
-                errors.append(f"Tag mismatch for {full_tag}: computed {expected}")
+    source_pids = {pid for p in database.get("source_pids", []) if (pid := p.get("pid_number"))}
+    valid_io_types = {"DI", "DO", "AI", "AO", "PI", "PO"}
+
+    # Per-instrument checks share one pass; each keeps its own list so the
+    # report stays grouped by check
+    tag_errors = []
+    io_point_errors = []
+    pid_warnings = []
+    io_type_errors = []
 
-    # Validate io_signals have unique io_point_ids
     for inst in instruments:
         tag_data = inst.get("tag", {})
-        tag = tag_data.get("full_tag", "unknown") if isinstance(tag_data, dict) else str(tag_data)
-        io_ids = [s.get("io_point_id") for s in inst.get("io_signals", []) if s.get("io_point_id")]
-        dup_io = set(x for x in io_ids if io_ids.count(x) > 1)
-        for dup in dup_io:
-            errors.append(f"Duplicate io_point_id in {tag}: {dup}")
-
-    # Validate equipment_tag references (warning)
-    equipment_tags = set()
-    for inst in instruments:
-        eq = inst.get("equipment_tag")
-        if eq:
-            equipment_tags.add(eq)
+        is_dict_tag = isinstance(tag_data, dict)
+        tag = tag_data.get("full_tag", "unknown") if is_dict_tag else str(tag_data)
+        io_signals = inst.get("io_signals", [])
 
-    # Check source_pids references
-    source_pids = {p.get("pid_number") for p in database.get("source_pids", [])}
-    for inst in instruments:
+        # Validate tag structure matches full_tag
+        if is_dict_tag:
+            get = tag_data.get
+            full_tag = get("full_tag", "")
+            if full_tag:
+                expected = (
+                    f"{get('area', '')}-{get('variable', '')}{get('function', '')}{get('modifier', '')}"
+                    f"-{get('loop_number', '')}{get('suffix', '')}"
+                )
+                if full_tag != expected:
+                    tag_errors.append(f"Tag mismatch for {full_tag}: computed {expected}")
+
+        # Validate io_signals have unique io_point_ids
+        for dup in _find_duplicates(s.get("io_point_id") for s in io_signals):
+            io_point_errors.append(f"Duplicate io_point_id in {tag}: {dup}")
+
+        # Check source_pids references (warning)
         pid_ref = inst.get("location", {}).get("pid_reference")
         if pid_ref and pid_ref not in source_pids:
-            tag_data = inst.get("tag", {})
-            full_tag = tag_data.get("full_tag") if isinstance(tag_data, dict) else str(tag_data)
-            msg = f"Warning: P&ID {pid_ref} referenced by {full_tag} not in source_pids"
-            if strict:
-                errors.append(msg)
-            else:
-                print(msg)
-
-    # Validate io_type consistency
-    valid_io_types = {"DI", "DO", "AI", "AO", "PI", "PO"}
-    for inst in instruments:
-        tag_data = inst.get("tag", {})
-        tag = tag_data.get("full_tag", "unknown") if isinstance(tag_data, dict) else str(tag_data)
-        for sig in inst.get("io_signals", []):
+            full_tag = tag_data.get("full_tag") if is_dict_tag else tag
+            pid_warnings.append(f"Warning: P&ID {pid_ref} referenced by {full_tag} not in source_pids")
+
+        # Validate io_type consistency
+        for sig in io_signals:
             io_type = sig.get("io_type")
             if io_type and io_type not in valid_io_types:
-                errors.append(f"Invalid io_type '{io_type}' in {tag}")
+                io_type_errors.append(f"Invalid io_type '{io_type}' in {tag}")
+
+    errors.extend(tag_errors)
+    errors.extend(io_point_errors)
+    if strict:
+        errors.extend(pid_warnings)
+    else:
+        for msg in pid_warnings:
+            print(msg)
+    errors.extend(io_type_errors)
 
     return errors
 
 
+def expand_database_paths(patterns: list) -> list:
+    """Expand glob patterns (including **) into database paths, keeping plain paths as given."""
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            paths.extend(Path(p) for p in sorted(glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(Path(pattern))
+    return paths
+
+
+def _validate_captured(database_path: Path, schema_path: Path, strict: bool,
+                       use_cache: bool, fast_fail: bool) -> tuple[str, list]:
+    """Run validate_database in a worker, returning its printed warnings with the errors."""
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        errors = validate_database(database_path, schema_path, strict, use_cache, fast_fail)
+    return output.getvalue(), errors
+
+
+def validate_databases(database_paths: list, schema_path: Path, strict: bool = False,
+                       jobs: int | None = None, use_cache: bool = False, fast_fail: bool = False) -> list:
+    """
+    Validate several databases in parallel worker processes.
+
+    YAML parsing and schema validation are CPU-bound pure Python, so each
+    database gets its own process rather than a thread.
+
+    Args:
+        database_paths: Paths to instrument database YAML files
+        schema_path: Path to schema YAML
+        strict: If True, fail on warnings
+        jobs: Worker process count (default: CPU count)
+        use_cache: If True, load through the JSON cache beside each database
+        fast_fail: If True, report only the first schema error per database
+
+    Returns:
+        List of (printed warnings, errors) tuples, in the same order as database_paths
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_validate_captured, path, schema_path, strict, use_cache, fast_fail) for path in database_paths]
+        return [future.result() for future in futures]
+
+
+def _write_errors(errors: list, prefix: str) -> None:
+    """Print one error per line with a single write instead of a print per error."""
+    sys.stdout.write(prefix + ("\n" + prefix).join(errors) + "\n")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Validate instrument database")
-    parser.add_argument("--database", "-d", required=True, help="Path to database YAML")
+    parser.add_argument("--database", "-d", required=True, nargs="+",
+                        help="Path(s) or glob pattern(s) of database YAML")
     parser.add_argument("--schema", "-s", help="Path to schema (default: auto-detect)")
     parser.add_argument("--strict", action="store_true", help="Treat warnings as errors")
+    parser.add_argument("--fast-fail", action="store_true",
+                        help="Stop schema validation at the first error")
+    parser.add_argument("--cache", action="store_true",
+                        help="Keep a JSON cache beside the database YAML for faster reloads")
+    parser.add_argument("--quiet", "-q", action="store_true",
+                        help="Only print error counts, not the individual errors")
+    parser.add_argument("--jobs", "-j", type=int, help="Worker processes for multiple databases (default: CPU count)")
     args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error(f"--jobs must be at least 1, got {args.jobs}")
 
-    database_path = Path(args.database)
-    if not database_path.exists():
-        print(f"Error: Database file not found: {database_path}")
+    database_paths = expand_database_paths(args.database)
+    if not database_paths:
+        print(f"Error: No database files match: {' '.join(args.database)}")
         sys.exit(1)
+    for database_path in database_paths:
+        if not database_path.exists():
+            print(f"Error: Database file not found: {database_path}")
+            sys.exit(1)
 
     # Find schema
     if args.schema:
@@ -151,16 +318,41 @@ def main():
         print(f"Error: Schema file not found: {schema_path}")
         sys.exit(1)
 
-    print(f"Validating {database_path}...")
-    errors = validate_database(database_path, schema_path, args.strict)
+    if len(database_paths) == 1:
+        database_path = database_paths[0]
+        print(f"Validating {database_path}...")
+        errors = validate_database(database_path, schema_path, args.strict, args.cache, args.fast_fail)
 
-    if errors:
-        print(f"\nValidation failed with {len(errors)} error(s):")
-        for error in errors:
-            print(f"  - {error}")
+        if errors:
+            print(f"\nValidation failed with {len(errors)} error(s)" + ("" if args.quiet else ":"))
+            if not args.quiet:
+                _write_errors(errors, "  - ")
+            sys.exit(1)
+        else:
+            print("Validation passed!")
+            sys.exit(0)
+
+    print(f"Validating {len(database_paths)} databases...")
+    results = validate_databases(database_paths, schema_path, args.strict, args.jobs, args.cache,
+                                 args.fast_fail)
+
+    failed = 0
+    for database_path, (warnings, errors) in zip(database_paths, results):
+        print(f"\n{database_path}:")
+        sys.stdout.write(warnings)
+        if errors:
+            failed += 1
+            print(f"  Validation failed with {len(errors)} error(s)" + ("" if args.quiet else ":"))
+            if not args.quiet:
+                _write_errors(errors, "    - ")
+        else:
+            print("  Validation passed")
+
+    if failed:
+        print(f"\n{failed} of {len(database_paths)} database(s) failed validation")
         sys.exit(1)
     else:
-        print("Validation passed!")
+        print("\nValidation passed!")
         sys.exit(0)
 
 